@@ -17,6 +17,24 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import adbc_driver_sqlite.dbapi as adbc_sqlite
+except ImportError:
+    # adbc is optional; tables are read through sqlite3 and pandas instead
+    adbc_sqlite = None
+
+try:
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    # pyarrow is optional; without it loaded tables are not cached and
+    # results are saved as CSV
+    feather = None
+    pq = None
+
+from src._kernels import groupby_mean
 
 # Configure logging
 logging.basicConfig(
@@ -28,33 +46,209 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def load_simulation_data(db_path):
+# Columns read by the analyses, per table
+ANALYSIS_COLUMNS = {
+    'simulations': [
+        'sim_id', 'start_year', 'portfolio_type', 'note_allocation', 'protection_level',
+        'withdrawal_rate', 'time_horizon', 'terminal_value', 'success_flag',
+        'max_drawdown', 'volatility', 'inflation_adjusted_terminal'
+    ],
+    'yearly_results': [
+        'sim_id', 'year', 'ending_value', 'withdrawal_amount',
+        'equity_value', 'note_value', 'bond_value'
+    ],
+    'market_conditions': [
+        'calendar_year', 'sp500_return', 'bond_return', 'inflation_rate'
+    ]
+}
+
+# Compact dtypes applied when loading; the integer columns are never NULL.
+# withdrawal_rate and protection_level stay float64 since the analyses
+# compare them for equality.
+COLUMN_DTYPES = {
+    'success_flag': 'int8',
+    'start_year': 'int16',
+    'time_horizon': 'int8',
+    'year': 'int16',
+    'note_allocation': 'float32',
+    'portfolio_type': 'category'
+}
+
+# Rows fetched from SQLite per chunk
+READ_CHUNK_SIZE = 200_000
+
+# Resolution of saved plots
+PLOT_DPI = 150
+
+# Options for result tables saved as CSV: six significant digits and
+# Unix line endings keep the files small and quick to format
+CSV_OPTIONS = dict(float_format='%.6g', lineterminator='\n', chunksize=65536)
+
+def _dtypes_for(columns):
+    """Return the COLUMN_DTYPES entries for the given columns."""
+    return {col: COLUMN_DTYPES[col] for col in columns if col in COLUMN_DTYPES}
+
+def _read_table(conn, table, columns):
+    """
+    Read the given columns of a table.
+    
+    With adbc the table is fetched as Arrow columns and converted to NumPy
+    column by column; otherwise it is read through sqlite3 in chunks.
+    
+    Args:
+        conn (Connection): Connection from _connect
+        table (str): Table name
+        columns (list): Columns to select
+        
+    Returns:
+        DataFrame: The selected columns of the table
+    """
+    query = f"SELECT {', '.join(columns)} FROM {table}"
+    dtype = _dtypes_for(columns)
+    
+    if adbc_sqlite is not None:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            df = cursor.fetch_arrow_table().to_pandas()
+        return df.astype(dtype)
+    
+    # Categories could differ between chunks, so categoricals are built after concatenating
+    chunk_dtype = {col: kind for col, kind in dtype.items() if kind != 'category'}
+    chunks = pd.read_sql_query(query, conn, dtype=chunk_dtype, chunksize=READ_CHUNK_SIZE)
+    return pd.concat(chunks, ignore_index=True).astype(dtype)
+
+# Per-connection SQLite settings for read-heavy analysis: memory-map the
+# database file, use a 256 MB page cache and keep temporary data in memory
+SQLITE_PRAGMAS = (
+    'PRAGMA mmap_size=30000000000',
+    'PRAGMA cache_size=-262144',
+    'PRAGMA temp_store=MEMORY'
+)
+
+# Shared sqlite3 connections by (process id, database path)
+_sqlite_connections = {}
+
+def get_sqlite_connection(db_path):
+    """
+    Return the shared sqlite3 connection to a database, opening it on first use.
+    
+    Reusing the connection keeps SQLite's page cache warm across loads and
+    queries. Each process opens its own, since connections must not be used
+    across a fork.
+    
+    Args:
+        db_path (str): Path to the SQLite database
+    
+    Returns:
+        Connection: Open sqlite3 connection; callers must not close it
+    """
+    key = (os.getpid(), os.path.abspath(db_path))
+    conn = _sqlite_connections.get(key)
+    if conn is None:
+        conn = sqlite3.connect(db_path)
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        _sqlite_connections[key] = conn
+    return conn
+
+def _connect(db_path):
+    """Open the database with adbc when available, otherwise return the shared sqlite3 connection."""
+    if adbc_sqlite is not None:
+        return adbc_sqlite.connect(db_path)
+    return get_sqlite_connection(db_path)
+
+def _cache_path(db_path, table):
+    """Return the path of the Parquet cache for a table of the database."""
+    return f"{db_path}.{table}.parquet"
+
+def _read_cached_table(db_path, table, columns):
+    """
+    Read a table from its Parquet cache.
+    
+    Args:
+        db_path (str): Path to the SQLite database
+        table (str): Table name
+        columns (list): Columns to read
+        
+    Returns:
+        DataFrame: The cached columns, or None if the cache is missing, older
+        than the database or lacks some of the columns
+    """
+    path = _cache_path(db_path, table)
+    if pq is None or not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(db_path):
+        return None
+    if not set(columns) <= set(pq.read_schema(path).names):
+        return None
+    # Caches written before a dtype change are converted on read
+    df = pd.read_parquet(path, engine='pyarrow', columns=columns, memory_map=True)
+    return df.astype(_dtypes_for(columns))
+
+def _write_cached_table(db_path, table, df):
+    """Write a loaded table to its Parquet cache, if pyarrow is available."""
+    if pq is None:
+        return
+    
+    try:
+        df.to_parquet(_cache_path(db_path, table), engine='pyarrow', compression='zstd', index=False)
+    except OSError as e:
+        logger.warning(f"Could not cache {table} table: {e}")
+
+def load_simulation_data(db_path, columns=None, use_cache=True, include_yearly=True):
     """
     Load simulation data from the SQLite database.
     
+    Tables are cached as Parquet files next to the database, and read back
+    from there on later runs until the database changes.
+    
     Args:
         db_path (str): Path to the SQLite database
+        columns (dict): Columns to load per table (defaults to ANALYSIS_COLUMNS)
+        use_cache (bool): Whether to read and write the Parquet cache
+        include_yearly (bool): Whether to load the yearly results table; if not,
+            yearly_results_df is None and plots query single simulations instead
         
     Returns:
         tuple: (simulations_df, yearly_results_df, market_conditions_df)
     """
     logger.info(f"Loading simulation data from {db_path}")
     
+    columns = {**ANALYSIS_COLUMNS, **(columns or {})}
+    
     try:
-        conn = sqlite3.connect(db_path)
-        
-        # Load simulations table
-        simulations_df = pd.read_sql_query("SELECT * FROM simulations", conn)
+        tables = {}
+        conn = None
         
-        # Load yearly results table
-        yearly_results_df = pd.read_sql_query("SELECT * FROM yearly_results", conn)
+        # Load the simulations, yearly results and market conditions tables
+        for table in ('simulations', 'yearly_results', 'market_conditions'):
+            if table == 'yearly_results' and not include_yearly:
+                tables[table] = None
+                continue
+            
+            df = _read_cached_table(db_path, table, columns[table]) if use_cache else None
+            
+            if df is None:
+                if conn is None:
+                    conn = _connect(db_path)
+                df = _read_table(conn, table, columns[table])
+                if use_cache:
+                    _write_cached_table(db_path, table, df)
+            else:
+                logger.info(f"Loaded {table} table from cache")
+            
+            tables[table] = df
         
-        # Load market conditions table
-        market_conditions_df = pd.read_sql_query("SELECT * FROM market_conditions", conn)
+        # The shared sqlite3 connection stays open for later queries
+        if conn is not None and adbc_sqlite is not None:
+            conn.close()
         
-        conn.close()
+        simulations_df = tables['simulations']
+        yearly_results_df = tables['yearly_results']
+        market_conditions_df = tables['market_conditions']
         
-        logger.info(f"Loaded {len(simulations_df)} simulations and {len(yearly_results_df)} yearly records")
+        if yearly_results_df is not None:
+            logger.info(f"Loaded {len(simulations_df)} simulations and {len(yearly_results_df)} yearly records")
+        else:
+            logger.info(f"Loaded {len(simulations_df)} simulations")
         
         return simulations_df, yearly_results_df, market_conditions_df
         
@@ -62,13 +256,123 @@ def load_simulation_data(db_path):
         logger.error(f"Error loading simulation data: {e}")
         raise
 
-def analyze_success_rates(simulations_df, output_dir=None):
+# Keys the success rate and terminal value analyses group by
+SUMMARY_KEYS = ['portfolio_type', 'withdrawal_rate', 'start_year', 'time_horizon']
+
+def _factorize_keys(df, keys):
+    """
+    Encode grouping keys as integer group codes.
+    
+    Each key is hashed once; the codes are then shared by every aggregation
+    over that key.
+    
+    Args:
+        df (DataFrame): DataFrame holding the key columns
+        keys (list): Names of the key columns
+    
+    Returns:
+        dict: (codes, uniques) by key name, with uniques sorted
+    """
+    return {key: pd.factorize(df[key], sort=True) for key in keys}
+
+def _mean_by_key(df, column, keys):
+    """
+    Calculate the mean of a column grouped separately by each key.
+    
+    Args:
+        df (DataFrame): DataFrame to aggregate
+        column (str): Column to average
+        keys (dict): Factorized keys from _factorize_keys
+    
+    Returns:
+        dict: Mean Series by key name, each indexed by its sorted key values
+    """
+    values = df[column].to_numpy(dtype=np.float64)
+    return {
+        name: pd.Series(groupby_mean(codes, values, len(uniques)),
+                        index=pd.Index(uniques, name=name), name=column)
+        for name, (codes, uniques) in keys.items()
+    }
+
+def _mean_table(df, column, keys, row_key, col_key):
+    """
+    Calculate the mean of a column for each combination of two keys.
+    
+    Args:
+        df (DataFrame): DataFrame to aggregate
+        column (str): Column to average
+        keys (dict): Factorized keys from _factorize_keys
+        row_key (str): Key for the table rows
+        col_key (str): Key for the table columns
+    
+    Returns:
+        DataFrame: Means with one row per row_key value and one column per col_key value
+    """
+    row_codes, row_uniques = keys[row_key]
+    col_codes, col_uniques = keys[col_key]
+    codes = np.where((row_codes >= 0) & (col_codes >= 0),
+                     row_codes * len(col_uniques) + col_codes, -1)
+    means = groupby_mean(codes, df[column].to_numpy(dtype=np.float64),
+                         len(row_uniques) * len(col_uniques))
+    return pd.DataFrame(means.reshape(len(row_uniques), len(col_uniques)),
+                        index=pd.Index(row_uniques, name=row_key),
+                        columns=pd.Index(col_uniques, name=col_key))
+
+def save_table(table, output_dir, name, output_format='feather'):
+    """
+    Save a result table as Feather, or as CSV if requested or pyarrow is missing.
+    
+    Feather files hold the index as regular columns and flattened column names.
+    Tables with a default RangeIndex are saved without it.
+    
+    Args:
+        table (Series or DataFrame): Result table to save
+        output_dir (str): Directory to save the table in
+        name (str): File name without extension
+        output_format (str): 'feather' or 'csv'
+    
+    Returns:
+        str: Path of the saved file
+    """
+    index = not isinstance(table.index, pd.RangeIndex)
+    
+    if output_format == 'csv' or feather is None:
+        path = os.path.join(output_dir, f"{name}.csv")
+        table.to_csv(path, index=index, **CSV_OPTIONS)
+        return path
+    
+    frame = table.to_frame() if isinstance(table, pd.Series) else table
+    frame = frame.reset_index(drop=not index)
+    # Feather needs flat string column names
+    frame.columns = [
+        '/'.join(str(level) for level in col if level != '') if isinstance(col, tuple) else str(col)
+        for col in frame.columns
+    ]
+    path = os.path.join(output_dir, f"{name}.feather")
+    feather.write_feather(frame, path)
+    return path
+
+def select_note_simulations(simulations_df):
+    """
+    Select the simulations of portfolios that hold structured notes.
+    
+    Args:
+        simulations_df (DataFrame): DataFrame containing simulation results
+    
+    Returns:
+        DataFrame: Simulations with a positive note allocation
+    """
+    return simulations_df.loc[simulations_df['note_allocation'].to_numpy() > 0]
+
+def analyze_success_rates(simulations_df, output_dir=None, output_format='feather', notes_df=None):
     """
     Analyze success rates by various parameters.
     
     Args:
         simulations_df (DataFrame): DataFrame containing simulation results
         output_dir (str): Directory to save output files
+        output_format (str): Format of the saved tables, 'feather' or 'csv'
+        notes_df (DataFrame): Simulations with a note allocation (selected from simulations_df if None)
     
     Returns:
         dict: Dictionary containing success rate analysis results
@@ -83,24 +387,25 @@ def analyze_success_rates(simulations_df, output_dir=None):
         
         logger.info(f"Overall success rate: {overall_success_rate:.2%} ({successful_simulations}/{total_simulations})")
         
-        # Success rates by portfolio type
-        success_by_portfolio = simulations_df.groupby('portfolio_type')['success_flag'].mean()
+        # Success rates by portfolio type, withdrawal rate, start year and time horizon
+        keys = _factorize_keys(simulations_df, SUMMARY_KEYS)
+        success_by = _mean_by_key(simulations_df, 'success_flag', keys)
+        success_by_portfolio = success_by['portfolio_type']
+        success_by_withdrawal = success_by['withdrawal_rate']
+        success_by_start_year = success_by['start_year']
+        success_by_horizon = success_by['time_horizon']
         
         # Success rates by protection level (for portfolios with notes)
-        notes_df = simulations_df[simulations_df['note_allocation'] > 0]
-        success_by_protection = notes_df.groupby('protection_level')['success_flag'].mean()
-        
-        # Success rates by withdrawal rate
-        success_by_withdrawal = simulations_df.groupby('withdrawal_rate')['success_flag'].mean()
-        
-        # Success rates by start year
-        success_by_start_year = simulations_df.groupby('start_year')['success_flag'].mean()
-        
-        # Success rates by time horizon
-        success_by_horizon = simulations_df.groupby('time_horizon')['success_flag'].mean()
+        if notes_df is None:
+            notes_df = select_note_simulations(simulations_df)
+        success_by_protection = _mean_by_key(
+            notes_df, 'success_flag', _factorize_keys(notes_df, ['protection_level'])
+        )['protection_level']
         
         # Success rates by portfolio type and withdrawal rate
-        success_by_portfolio_withdrawal = simulations_df.groupby(['portfolio_type', 'withdrawal_rate'])['success_flag'].mean().unstack()
+        success_by_portfolio_withdrawal = _mean_table(
+            simulations_df, 'success_flag', keys, 'portfolio_type', 'withdrawal_rate'
+        )
         
         # Create analysis results dictionary
         results = {
@@ -113,7 +418,7 @@ def analyze_success_rates(simulations_df, output_dir=None):
             'success_by_portfolio_withdrawal': success_by_portfolio_withdrawal
         }
         
-        # Save results to CSV if output_dir is provided
+        # Save results if output_dir is provided
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
             
@@ -122,15 +427,15 @@ def analyze_success_rates(simulations_df, output_dir=None):
                 'metric': ['overall_success_rate'],
                 'value': [overall_success_rate]
             })
-            overall_df.to_csv(os.path.join(output_dir, 'overall_success_rate.csv'), index=False)
+            save_table(overall_df, output_dir, 'overall_success_rate', output_format)
             
             # Save grouped results
-            success_by_portfolio.to_csv(os.path.join(output_dir, 'success_by_portfolio.csv'))
-            success_by_protection.to_csv(os.path.join(output_dir, 'success_by_protection.csv'))
-            success_by_withdrawal.to_csv(os.path.join(output_dir, 'success_by_withdrawal.csv'))
-            success_by_start_year.to_csv(os.path.join(output_dir, 'success_by_start_year.csv'))
-            success_by_horizon.to_csv(os.path.join(output_dir, 'success_by_horizon.csv'))
-            success_by_portfolio_withdrawal.to_csv(os.path.join(output_dir, 'success_by_portfolio_withdrawal.csv'))
+            save_table(success_by_portfolio, output_dir, 'success_by_portfolio', output_format)
+            save_table(success_by_protection, output_dir, 'success_by_protection', output_format)
+            save_table(success_by_withdrawal, output_dir, 'success_by_withdrawal', output_format)
+            save_table(success_by_start_year, output_dir, 'success_by_start_year', output_format)
+            save_table(success_by_horizon, output_dir, 'success_by_horizon', output_format)
+            save_table(success_by_portfolio_withdrawal, output_dir, 'success_by_portfolio_withdrawal', output_format)
             
             logger.info(f"Success rate analysis results saved to {output_dir}")
         
@@ -140,13 +445,15 @@ def analyze_success_rates(simulations_df, output_dir=None):
         logger.error(f"Error analyzing success rates: {e}")
         raise
 
-def analyze_terminal_values(simulations_df, output_dir=None):
+def analyze_terminal_values(simulations_df, output_dir=None, output_format='feather', notes_df=None):
     """
     Analyze terminal values by various parameters.
     
     Args:
         simulations_df (DataFrame): DataFrame containing simulation results
         output_dir (str): Directory to save output files
+        output_format (str): Format of the saved tables, 'feather' or 'csv'
+        notes_df (DataFrame): Simulations with a note allocation (selected from simulations_df if None)
     
     Returns:
         dict: Dictionary containing terminal value analysis results
@@ -160,24 +467,25 @@ def analyze_terminal_values(simulations_df, output_dir=None):
         
         logger.info(f"Overall terminal value statistics:\n{overall_stats}")
         
-        # Terminal values by portfolio type
-        terminal_by_portfolio = simulations_df.groupby('portfolio_type')['terminal_value'].mean()
+        # Terminal values by portfolio type, withdrawal rate, start year and time horizon
+        keys = _factorize_keys(simulations_df, SUMMARY_KEYS)
+        terminal_by = _mean_by_key(simulations_df, 'terminal_value', keys)
+        terminal_by_portfolio = terminal_by['portfolio_type']
+        terminal_by_withdrawal = terminal_by['withdrawal_rate']
+        terminal_by_start_year = terminal_by['start_year']
+        terminal_by_horizon = terminal_by['time_horizon']
         
         # Terminal values by protection level (for portfolios with notes)
-        notes_df = simulations_df[simulations_df['note_allocation'] > 0]
-        terminal_by_protection = notes_df.groupby('protection_level')['terminal_value'].mean()
-        
-        # Terminal values by withdrawal rate
-        terminal_by_withdrawal = simulations_df.groupby('withdrawal_rate')['terminal_value'].mean()
-        
-        # Terminal values by start year
-        terminal_by_start_year = simulations_df.groupby('start_year')['terminal_value'].mean()
-        
-        # Terminal values by time horizon
-        terminal_by_horizon = simulations_df.groupby('time_horizon')['terminal_value'].mean()
+        if notes_df is None:
+            notes_df = select_note_simulations(simulations_df)
+        terminal_by_protection = _mean_by_key(
+            notes_df, 'terminal_value', _factorize_keys(notes_df, ['protection_level'])
+        )['protection_level']
         
         # Terminal values by portfolio type and withdrawal rate
-        terminal_by_portfolio_withdrawal = simulations_df.groupby(['portfolio_type', 'withdrawal_rate'])['terminal_value'].mean().unstack()
+        terminal_by_portfolio_withdrawal = _mean_table(
+            simulations_df, 'terminal_value', keys, 'portfolio_type', 'withdrawal_rate'
+        )
         
         # Create analysis results dictionary
         results = {
@@ -191,21 +499,21 @@ def analyze_terminal_values(simulations_df, output_dir=None):
             'terminal_by_portfolio_withdrawal': terminal_by_portfolio_withdrawal
         }
         
-        # Save results to CSV if output_dir is provided
+        # Save results if output_dir is provided
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
             
             # Save overall results
-            overall_stats.to_csv(os.path.join(output_dir, 'terminal_value_stats.csv'))
-            inflation_adjusted_stats.to_csv(os.path.join(output_dir, 'inflation_adjusted_terminal_stats.csv'))
+            save_table(overall_stats, output_dir, 'terminal_value_stats', output_format)
+            save_table(inflation_adjusted_stats, output_dir, 'inflation_adjusted_terminal_stats', output_format)
             
             # Save grouped results
-            terminal_by_portfolio.to_csv(os.path.join(output_dir, 'terminal_by_portfolio.csv'))
-            terminal_by_protection.to_csv(os.path.join(output_dir, 'terminal_by_protection.csv'))
-            terminal_by_withdrawal.to_csv(os.path.join(output_dir, 'terminal_by_withdrawal.csv'))
-            terminal_by_start_year.to_csv(os.path.join(output_dir, 'terminal_by_start_year.csv'))
-            terminal_by_horizon.to_csv(os.path.join(output_dir, 'terminal_by_horizon.csv'))
-            terminal_by_portfolio_withdrawal.to_csv(os.path.join(output_dir, 'terminal_by_portfolio_withdrawal.csv'))
+            save_table(terminal_by_portfolio, output_dir, 'terminal_by_portfolio', output_format)
+            save_table(terminal_by_protection, output_dir, 'terminal_by_protection', output_format)
+            save_table(terminal_by_withdrawal, output_dir, 'terminal_by_withdrawal', output_format)
+            save_table(terminal_by_start_year, output_dir, 'terminal_by_start_year', output_format)
+            save_table(terminal_by_horizon, output_dir, 'terminal_by_horizon', output_format)
+            save_table(terminal_by_portfolio_withdrawal, output_dir, 'terminal_by_portfolio_withdrawal', output_format)
             
             logger.info(f"Terminal value analysis results saved to {output_dir}")
         
@@ -215,15 +523,44 @@ def analyze_terminal_values(simulations_df, output_dir=None):
         logger.error(f"Error analyzing terminal values: {e}")
         raise
 
-def plot_portfolio_growth(yearly_results_df, simulations_df, output_dir=None, selected_sim_ids=None):
+def load_yearly_results(db_path, sim_ids):
+    """
+    Load the yearly results of the given simulations only.
+    
+    Args:
+        db_path (str): Path to the SQLite database
+        sim_ids (list): Simulation IDs to load
+    
+    Returns:
+        dict: DataFrame of yearly results ordered by year, by simulation ID
+    """
+    query = (f"SELECT {', '.join(ANALYSIS_COLUMNS['yearly_results'][1:])} FROM yearly_results "
+             "WHERE sim_id = ? ORDER BY year")
+    
+    conn = get_sqlite_connection(db_path)
+    
+    # Databases from setup_database.py already have this index
+    try:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_yearly_sim_id ON yearly_results(sim_id)")
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Could not index yearly results by sim_id: {e}")
+    
+    return {
+        sim_id: pd.read_sql_query(query, conn, params=(sim_id,), dtype=_dtypes_for(['year']))
+        for sim_id in sim_ids
+    }
+
+def plot_portfolio_growth(yearly_results_df, simulations_df, output_dir=None, selected_sim_ids=None, db_path=None):
     """
     Plot portfolio growth for selected simulations.
     
     Args:
-        yearly_results_df (DataFrame): DataFrame containing yearly results
+        yearly_results_df (DataFrame): DataFrame containing yearly results, or None
+            to query the selected simulations from db_path
         simulations_df (DataFrame): DataFrame containing simulation parameters
         output_dir (str): Directory to save output files
         selected_sim_ids (list): List of simulation IDs to plot (if None, selects representative examples)
+        db_path (str): Path to the SQLite database, used when yearly_results_df is None
     
     Returns:
         dict: Dictionary containing generated plot file paths
@@ -235,22 +572,19 @@ def plot_portfolio_growth(yearly_results_df, simulations_df, output_dir=None, se
         if selected_sim_ids is None:
             # Sample one simulation for each portfolio type with 4% withdrawal rate and 10% protection
             selected_sim_ids = []
-            for portfolio_type in simulations_df['portfolio_type'].unique():
-                filtered = simulations_df[
-                    (simulations_df['portfolio_type'] == portfolio_type) & 
-                    (simulations_df['withdrawal_rate'] == 0.04)
-                ]
-                
-                if not filtered.empty:
-                    # For portfolios with notes, select one with 10% protection if available
-                    if portfolio_type != 'traditional':
-                        note_sim = filtered[filtered['protection_level'] == 0.10]
-                        if not note_sim.empty:
-                            selected_sim_ids.append(note_sim.iloc[0]['sim_id'])
-                            continue
-                    
-                    # Otherwise just select the first one
-                    selected_sim_ids.append(filtered.iloc[0]['sim_id'])
+            candidates = simulations_df.loc[simulations_df['withdrawal_rate'].to_numpy() == 0.04,
+                                            ['sim_id', 'portfolio_type', 'protection_level']]
+            
+            # First simulation of each type, overall and with 10% protection
+            first_sim = candidates.groupby('portfolio_type', sort=False, observed=True)['sim_id'].first()
+            first_protected = candidates[candidates['protection_level'] == 0.10].groupby(
+                'portfolio_type', sort=False, observed=True)['sim_id'].first()
+            
+            for portfolio_type, sim_id in first_sim.items():
+                # For portfolios with notes, select one with 10% protection if available
+                if portfolio_type != 'traditional':
+                    sim_id = first_protected.get(portfolio_type, sim_id)
+                selected_sim_ids.append(sim_id)
         
         # Create output directory if provided
         if output_dir:
@@ -258,41 +592,56 @@ def plot_portfolio_growth(yearly_results_df, simulations_df, output_dir=None, se
         
         plot_files = {}
         
+        # Index simulations and yearly result rows by sim_id once, instead of
+        # scanning both frames for every selected simulation
+        sim_by_id = simulations_df.set_index('sim_id')
+        if yearly_results_df is not None:
+            result_rows = yearly_results_df.groupby('sim_id', sort=False).indices
+            yearly_by_sim = {
+                sim_id: yearly_results_df.iloc[result_rows[sim_id]].sort_values('year')
+                for sim_id in selected_sim_ids if sim_id in result_rows
+            }
+        else:
+            yearly_by_sim = load_yearly_results(db_path, selected_sim_ids)
+        
         # Plot each selected simulation
+        fig = None
         for sim_id in selected_sim_ids:
             # Get simulation details
-            sim_details = simulations_df[simulations_df['sim_id'] == sim_id].iloc[0]
+            sim_details = sim_by_id.loc[sim_id]
             
             # Get yearly results for this simulation
-            sim_results = yearly_results_df[yearly_results_df['sim_id'] == sim_id].sort_values('year')
-            
-            if sim_results.empty:
+            sim_results = yearly_by_sim.get(sim_id)
+            if sim_results is None or sim_results.empty:
                 logger.warning(f"No yearly results found for simulation {sim_id}")
                 continue
             
-            # Plot portfolio growth
-            plt.figure(figsize=(12, 8))
+            # Plot portfolio growth, reusing the figure of the previous saved plot
+            if fig is None:
+                fig, ax = plt.subplots(figsize=(12, 8), constrained_layout=True)
+            else:
+                ax.clear()
             
             # Plot total portfolio value
-            plt.plot(sim_results['year'], sim_results['ending_value'], 
+            ax.plot(sim_results['year'], sim_results['ending_value'], 
                     label='Portfolio Value', linewidth=2)
             
             # Plot component values
-            plt.plot(sim_results['year'], sim_results['equity_value'], 
+            ax.plot(sim_results['year'], sim_results['equity_value'], 
                     label='Equity', linestyle='--')
-            plt.plot(sim_results['year'], sim_results['note_value'], 
+            ax.plot(sim_results['year'], sim_results['note_value'], 
                     label='Structured Notes', linestyle='--')
-            plt.plot(sim_results['year'], sim_results['bond_value'], 
+            ax.plot(sim_results['year'], sim_results['bond_value'], 
                     label='Bonds', linestyle='--')
             
             # Plot cumulative withdrawals
-            cumulative_withdrawals = sim_results['withdrawal_amount'].cumsum()
-            plt.plot(sim_results['year'], cumulative_withdrawals, 
+            cumulative_withdrawals = np.cumsum(sim_results['withdrawal_amount'].to_numpy())
+            ax.plot(sim_results['year'], cumulative_withdrawals, 
                     label='Cumulative Withdrawals', linestyle=':')
             
             # Add labels and title
-            plt.xlabel('Year')
-            plt.ylabel('Value ($)')
+            ax.set_xlabel('Year')
+            ax.set_ylabel('Value ($)')
             
             portfolio_type = sim_details['portfolio_type']
             withdrawal_rate = sim_details['withdrawal_rate'] * 100
@@ -304,19 +653,22 @@ def plot_portfolio_growth(yearly_results_df, simulations_df, output_dir=None, se
             else:
                 title = f"Portfolio Growth - {portfolio_type.capitalize()} - {withdrawal_rate:.1f}% Withdrawal - Starting {start_year}"
             
-            plt.title(title)
-            plt.grid(True, alpha=0.3)
-            plt.legend()
+            ax.set_title(title)
+            ax.grid(True, alpha=0.3)
+            ax.legend()
             
             # Save plot if output_dir is provided
             if output_dir:
                 plot_file = os.path.join(output_dir, f"portfolio_growth_{sim_id}.png")
-                plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+                fig.savefig(plot_file, dpi=PLOT_DPI)
                 plot_files[sim_id] = plot_file
-                plt.close()
                 logger.info(f"Saved portfolio growth plot to {plot_file}")
             else:
                 plt.show()
+                fig = None
+        
+        if fig is not None:
+            plt.close(fig)
         
         return plot_files
     
@@ -324,7 +676,7 @@ def plot_portfolio_growth(yearly_results_df, simulations_df, output_dir=None, se
         logger.error(f"Error plotting portfolio growth: {e}")
         raise
 
-def compare_protection_levels(yearly_results_df, simulations_df, output_dir=None):
+def compare_protection_levels(yearly_results_df, simulations_df, output_dir=None, output_format='feather', notes_df=None):
     """
     Compare the performance of different protection levels for structured notes.
     
@@ -332,6 +684,8 @@ def compare_protection_levels(yearly_results_df, simulations_df, output_dir=None
         yearly_results_df (DataFrame): DataFrame containing yearly results
         simulations_df (DataFrame): DataFrame containing simulation parameters
         output_dir (str): Directory to save output files
+        output_format (str): Format of the saved tables, 'feather' or 'csv'
+        notes_df (DataFrame): Simulations with a note allocation (selected from simulations_df if None)
     
     Returns:
         DataFrame: Comparison of protection levels
@@ -340,63 +694,48 @@ def compare_protection_levels(yearly_results_df, simulations_df, output_dir=None
     
     try:
         # Filter to only include simulations with notes
-        notes_df = simulations_df[simulations_df['note_allocation'] > 0]
-        
-        # Group by relevant parameters and calculate mean terminal value
-        comparison = notes_df.groupby(['portfolio_type', 'protection_level', 'withdrawal_rate', 'time_horizon'])['terminal_value'].mean().reset_index()
-        
-        # Calculate success rates
-        success_rates = notes_df.groupby(['portfolio_type', 'protection_level', 'withdrawal_rate', 'time_horizon'])['success_flag'].mean().reset_index()
-        success_rates.rename(columns={'success_flag': 'success_rate'}, inplace=True)
+        if notes_df is None:
+            notes_df = select_note_simulations(simulations_df)
         
-        # Merge the results
-        comparison = pd.merge(comparison, success_rates, on=['portfolio_type', 'protection_level', 'withdrawal_rate', 'time_horizon'])
+        # Mean terminal value and success rate per parameter combination
+        comparison = notes_df.groupby(['portfolio_type', 'protection_level', 'withdrawal_rate', 'time_horizon'], observed=True).agg(
+            terminal_value=('terminal_value', 'mean'),
+            success_rate=('success_flag', 'mean')
+        ).reset_index()
         
-        # Save to CSV if output_dir is provided
+        # Save results if output_dir is provided
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
-            csv_path = os.path.join(output_dir, 'protection_level_comparison.csv')
-            comparison.to_csv(csv_path, index=False)
-            logger.info(f"Protection level comparison saved to {csv_path}")
+            table_path = save_table(comparison, output_dir, 'protection_level_comparison', output_format)
+            logger.info(f"Protection level comparison saved to {table_path}")
             
             # Create a pivot table for easier visualization
-            pivot = pd.pivot_table(
-                comparison, 
-                values=['terminal_value', 'success_rate'],
-                index=['portfolio_type', 'withdrawal_rate', 'time_horizon'],
-                columns=['protection_level']
-            )
-            
-            pivot_path = os.path.join(output_dir, 'protection_level_pivot.csv')
-            pivot.to_csv(pivot_path)
+            pivot = comparison.set_index(
+                ['portfolio_type', 'withdrawal_rate', 'time_horizon', 'protection_level']
+            )[['success_rate', 'terminal_value']].unstack('protection_level')
+            
+            pivot_path = save_table(pivot, output_dir, 'protection_level_pivot', output_format)
             logger.info(f"Protection level pivot table saved to {pivot_path}")
             
             # Plot the comparison
-            plt.figure(figsize=(12, 8))
-            
-            for portfolio_type in comparison['portfolio_type'].unique():
-                for withdrawal_rate in comparison['withdrawal_rate'].unique():
-                    for horizon in comparison['time_horizon'].unique():
-                        subset = comparison[
-                            (comparison['portfolio_type'] == portfolio_type) &
-                            (comparison['withdrawal_rate'] == withdrawal_rate) &
-                            (comparison['time_horizon'] == horizon)
-                        ]
-                        
-                        if not subset.empty:
-                            label = f"{portfolio_type.capitalize()} - {withdrawal_rate*100:.1f}% - {horizon}yr"
-                            plt.plot(subset['protection_level'] * 100, subset['terminal_value'], 
-                                    marker='o', label=label)
-            
-            plt.xlabel('Protection Level (%)')
-            plt.ylabel('Average Terminal Value ($)')
-            plt.title('Average Terminal Value by Protection Level')
-            plt.grid(True, alpha=0.3)
-            plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+            fig, ax = plt.subplots(figsize=(12, 8), constrained_layout=True)
+            
+            # One line per parameter combination; comparison is already sorted by these keys
+            for (portfolio_type, withdrawal_rate, horizon), subset in comparison.groupby(
+                    ['portfolio_type', 'withdrawal_rate', 'time_horizon'], sort=False, observed=True):
+                label = f"{portfolio_type.capitalize()} - {withdrawal_rate*100:.1f}% - {horizon}yr"
+                ax.plot(subset['protection_level'] * 100, subset['terminal_value'], 
+                        marker='o', label=label)
+            
+            ax.set_xlabel('Protection Level (%)')
+            ax.set_ylabel('Average Terminal Value ($)')
+            ax.set_title('Average Terminal Value by Protection Level')
+            ax.grid(True, alpha=0.3)
+            ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
             
             plot_path = os.path.join(output_dir, 'protection_level_comparison.png')
-            plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            fig.savefig(plot_path, dpi=PLOT_DPI)
+            plt.close(fig)
             logger.info(f"Protection level comparison plot saved to {plot_path}")
         
         return comparison
@@ -405,13 +744,14 @@ def compare_protection_levels(yearly_results_df, simulations_df, output_dir=None
         logger.error(f"Error comparing protection levels: {e}")
         raise
 
-def compare_portfolio_types(simulations_df, output_dir=None):
+def compare_portfolio_types(simulations_df, output_dir=None, output_format='feather'):
     """
     Compare the performance of different portfolio types.
     
     Args:
         simulations_df (DataFrame): DataFrame containing simulation parameters
         output_dir (str): Directory to save output files
+        output_format (str): Format of the saved tables, 'feather' or 'csv'
     
     Returns:
         DataFrame: Comparison of portfolio types
@@ -419,98 +759,72 @@ def compare_portfolio_types(simulations_df, output_dir=None):
     logger.info("Comparing portfolio types")
     
     try:
-        # Group by relevant parameters and calculate mean terminal value
-        comparison = simulations_df.groupby(['portfolio_type', 'withdrawal_rate', 'time_horizon'])['terminal_value'].mean().reset_index()
-        
-        # Calculate success rates
-        success_rates = simulations_df.groupby(['portfolio_type', 'withdrawal_rate', 'time_horizon'])['success_flag'].mean().reset_index()
-        success_rates.rename(columns={'success_flag': 'success_rate'}, inplace=True)
-        
-        # Calculate risk metrics
-        volatility = simulations_df.groupby(['portfolio_type', 'withdrawal_rate', 'time_horizon'])['volatility'].mean().reset_index()
-        max_drawdown = simulations_df.groupby(['portfolio_type', 'withdrawal_rate', 'time_horizon'])['max_drawdown'].mean().reset_index()
-        
-        # Merge the results
-        comparison = pd.merge(comparison, success_rates, on=['portfolio_type', 'withdrawal_rate', 'time_horizon'])
-        comparison = pd.merge(comparison, volatility, on=['portfolio_type', 'withdrawal_rate', 'time_horizon'])
-        comparison = pd.merge(comparison, max_drawdown, on=['portfolio_type', 'withdrawal_rate', 'time_horizon'])
-        
-        # Save to CSV if output_dir is provided
+        # Mean terminal value, success rate and risk metrics per parameter combination
+        comparison = simulations_df.groupby(['portfolio_type', 'withdrawal_rate', 'time_horizon'], observed=True).agg(
+            terminal_value=('terminal_value', 'mean'),
+            success_rate=('success_flag', 'mean'),
+            volatility=('volatility', 'mean'),
+            max_drawdown=('max_drawdown', 'mean')
+        ).reset_index()
+        
+        # Save results if output_dir is provided
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
-            csv_path = os.path.join(output_dir, 'portfolio_type_comparison.csv')
-            comparison.to_csv(csv_path, index=False)
-            logger.info(f"Portfolio type comparison saved to {csv_path}")
+            table_path = save_table(comparison, output_dir, 'portfolio_type_comparison', output_format)
+            logger.info(f"Portfolio type comparison saved to {table_path}")
             
             # Create a pivot table for easier visualization
-            pivot = pd.pivot_table(
-                comparison, 
-                values=['terminal_value', 'success_rate', 'volatility', 'max_drawdown'],
-                index=['withdrawal_rate', 'time_horizon'],
-                columns=['portfolio_type']
-            )
-            
-            pivot_path = os.path.join(output_dir, 'portfolio_type_pivot.csv')
-            pivot.to_csv(pivot_path)
+            pivot = comparison.set_index(
+                ['withdrawal_rate', 'time_horizon', 'portfolio_type']
+            )[['max_drawdown', 'success_rate', 'terminal_value', 'volatility']].unstack('portfolio_type')
+            
+            pivot_path = save_table(pivot, output_dir, 'portfolio_type_pivot', output_format)
             logger.info(f"Portfolio type pivot table saved to {pivot_path}")
             
             # Plot terminal values comparison
-            plt.figure(figsize=(12, 8))
-            
-            for withdrawal_rate in comparison['withdrawal_rate'].unique():
-                for horizon in comparison['time_horizon'].unique():
-                    subset = comparison[
-                        (comparison['withdrawal_rate'] == withdrawal_rate) &
-                        (comparison['time_horizon'] == horizon)
-                    ]
-                    
-                    if not subset.empty:
-                        label = f"{withdrawal_rate*100:.1f}% - {horizon}yr"
-                        plt.bar(
-                            x=subset['portfolio_type'], 
-                            height=subset['terminal_value'],
-                            label=label,
-                            alpha=0.7
-                        )
-            
-            plt.xlabel('Portfolio Type')
-            plt.ylabel('Average Terminal Value ($)')
-            plt.title('Average Terminal Value by Portfolio Type')
-            plt.grid(True, alpha=0.3)
-            plt.legend()
+            fig, ax = plt.subplots(figsize=(12, 8), constrained_layout=True)
+            
+            for (withdrawal_rate, horizon), subset in comparison.groupby(
+                    ['withdrawal_rate', 'time_horizon'], sort=False):
+                label = f"{withdrawal_rate*100:.1f}% - {horizon}yr"
+                ax.bar(
+                    x=subset['portfolio_type'], 
+                    height=subset['terminal_value'],
+                    label=label,
+                    alpha=0.7
+                )
+            
+            ax.set_xlabel('Portfolio Type')
+            ax.set_ylabel('Average Terminal Value ($)')
+            ax.set_title('Average Terminal Value by Portfolio Type')
+            ax.grid(True, alpha=0.3)
+            ax.legend()
             
             plot_path = os.path.join(output_dir, 'portfolio_type_terminal_comparison.png')
-            plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            # Plot success rate comparison
-            plt.figure(figsize=(12, 8))
-            
-            for withdrawal_rate in comparison['withdrawal_rate'].unique():
-                for horizon in comparison['time_horizon'].unique():
-                    subset = comparison[
-                        (comparison['withdrawal_rate'] == withdrawal_rate) &
-                        (comparison['time_horizon'] == horizon)
-                    ]
-                    
-                    if not subset.empty:
-                        label = f"{withdrawal_rate*100:.1f}% - {horizon}yr"
-                        plt.bar(
-                            x=subset['portfolio_type'], 
-                            height=subset['success_rate'] * 100,
-                            label=label,
-                            alpha=0.7
-                        )
-            
-            plt.xlabel('Portfolio Type')
-            plt.ylabel('Success Rate (%)')
-            plt.title('Success Rate by Portfolio Type')
-            plt.grid(True, alpha=0.3)
-            plt.legend()
+            fig.savefig(plot_path, dpi=PLOT_DPI)
+            
+            # Plot success rate comparison on the same figure
+            ax.clear()
+            
+            for (withdrawal_rate, horizon), subset in comparison.groupby(
+                    ['withdrawal_rate', 'time_horizon'], sort=False):
+                label = f"{withdrawal_rate*100:.1f}% - {horizon}yr"
+                ax.bar(
+                    x=subset['portfolio_type'], 
+                    height=subset['success_rate'] * 100,
+                    label=label,
+                    alpha=0.7
+                )
+            
+            ax.set_xlabel('Portfolio Type')
+            ax.set_ylabel('Success Rate (%)')
+            ax.set_title('Success Rate by Portfolio Type')
+            ax.grid(True, alpha=0.3)
+            ax.legend()
             
             plot_path = os.path.join(output_dir, 'portfolio_type_success_comparison.png')
-            plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            fig.savefig(plot_path, dpi=PLOT_DPI)
+            plt.close(fig)
             
             logger.info(f"Portfolio type comparison plots saved to {output_dir}")
         
@@ -520,6 +834,31 @@ def compare_portfolio_types(simulations_df, output_dir=None):
         logger.error(f"Error comparing portfolio types: {e}")
         raise
 
+def run_analyses(tasks, parallel=True):
+    """
+    Run independent analyses, in worker processes if requested.
+    
+    The analyses only read the DataFrames passed to them and write to their
+    own output directories, so they can run side by side. Workers draw with
+    the Agg backend, which is only suitable when plots are saved to files.
+    
+    Args:
+        tasks (list): (function, args) pairs to run
+        parallel (bool): Whether to run the tasks in a process pool
+    """
+    if not parallel or len(tasks) < 2:
+        for func, func_args in tasks:
+            func(*func_args)
+        return
+    
+    num_workers = min(len(tasks), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=plt.switch_backend,
+                             initargs=('Agg',)) as executor:
+        futures = [executor.submit(func, *func_args) for func, func_args in tasks]
+        # Wait for all analyses, raising the first error
+        for future in futures:
+            future.result()
+
 def main():
     parser = argparse.ArgumentParser(description='Analyze portfolio simulation results')
     parser.add_argument('--db', type=str, required=True,
@@ -534,6 +873,12 @@ def main():
                         help='Compare different portfolio types')
     parser.add_argument('--all', action='store_true',
                         help='Run all analyses')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Read the database directly instead of the Parquet cache')
+    parser.add_argument('--sequential', action='store_true',
+                        help='Run the analyses one after another instead of in parallel')
+    parser.add_argument('--csv', action='store_true',
+                        help='Save result tables as CSV instead of Feather')
     args = parser.parse_args()
     
     try:
@@ -546,28 +891,40 @@ def main():
         else:
             output_dir = None
         
+        # Plots are only written to files when saving, so no GUI backend is needed
+        if output_dir:
+            plt.switch_backend('Agg')
+        
         # Load simulation data
-        simulations_df, yearly_results_df, market_conditions_df = load_simulation_data(args.db)
+        # Only the growth plots use yearly results, and they query the few simulations they plot
+        simulations_df, yearly_results_df, market_conditions_df = load_simulation_data(
+            args.db, use_cache=not args.no_cache, include_yearly=False)
         
         # Run analyses based on arguments
+        output_format = 'csv' if args.csv else 'feather'
+        notes_df = select_note_simulations(simulations_df)
+        tasks = []
         if args.all or args.plot_growth:
             plot_growth_dir = os.path.join(output_dir, "portfolio_growth") if output_dir else None
-            plot_portfolio_growth(yearly_results_df, simulations_df, plot_growth_dir)
+            tasks.append((plot_portfolio_growth, (yearly_results_df, simulations_df, plot_growth_dir, None, args.db)))
         
         if args.all or args.compare_protection:
             protection_dir = os.path.join(output_dir, "protection_comparison") if output_dir else None
-            compare_protection_levels(yearly_results_df, simulations_df, protection_dir)
+            tasks.append((compare_protection_levels, (yearly_results_df, simulations_df, protection_dir, output_format, notes_df)))
         
         if args.all or args.compare_portfolios:
             portfolio_dir = os.path.join(output_dir, "portfolio_comparison") if output_dir else None
-            compare_portfolio_types(simulations_df, portfolio_dir)
+            tasks.append((compare_portfolio_types, (simulations_df, portfolio_dir, output_format)))
         
         # Always run these basic analyses
         success_dir = os.path.join(output_dir, "success_rates") if output_dir else None
-        analyze_success_rates(simulations_df, success_dir)
+        tasks.append((analyze_success_rates, (simulations_df, success_dir, output_format, notes_df)))
         
         terminal_dir = os.path.join(output_dir, "terminal_values") if output_dir else None
-        analyze_terminal_values(simulations_df, terminal_dir)
+        tasks.append((analyze_terminal_values, (simulations_df, terminal_dir, output_format, notes_df)))
+        
+        # Without an output directory plots are shown interactively, so run in order
+        run_analyses(tasks, parallel=bool(output_dir) and not args.sequential)
         
         if output_dir:
             logger.info(f"All analyses complete. Results saved to {output_dir}")
@@ -1,5 +1,4 @@
 import os
-import glob
 
 def cleanup_old_note_files():
     # Get the script's directory and move up one level
@@ -7,16 +6,27 @@ def cleanup_old_note_files():
     parent_dir = os.path.join(script_dir, "..")
     note_data_dir = os.path.join(parent_dir, "note_data")
     
-    # Pattern to match timestamped note files
-    pattern = os.path.join(note_data_dir, "note_participation_rates_*.csv")
+    # Prefix and extension of timestamped note files
+    prefix = "note_participation_rates_"
     
-    # Find and delete matching files
-    for file_path in glob.glob(pattern):
+    # Find and delete matching files in a single directory scan
+    try:
+        with os.scandir(note_data_dir) as it:
+            entries = list(it)
+    except FileNotFoundError:
+        entries = []
+    
+    for entry in entries:
+        if not (entry.name.startswith(prefix) and entry.name.endswith(".csv")):
+            continue
         try:
-            os.remove(file_path)
-            print(f"Deleted: {file_path}")
+            os.unlink(entry.path)
+            print(f"Deleted: {entry.path}")
+        except FileNotFoundError:
+            # Already removed by someone else
+            continue
         except Exception as e:
-            print(f"Error deleting {file_path}: {e}")
+            print(f"Error deleting {entry.path}: {e}")
 
     print(f"\nCurrent note data should be in: {os.path.join(note_data_dir, 'growth_notes.csv')}")
 
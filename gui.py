@@ -7,19 +7,75 @@ allowing users to configure and run simulations with structured notes.
 """
 
 import os
+import logging
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import subprocess
-import pandas as pd
+import threading
+import traceback
 from datetime import datetime
 import sys
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
+
+# Number of lines kept in the simulation log view
+LOG_VIEW_MAX_LINES = 1000
+
+class _TkLogHandler(logging.Handler):
+    """Logging handler that passes formatted records to a callback on the Tk thread."""
+    
+    def __init__(self, root, callback):
+        super().__init__()
+        self.root = root
+        self.callback = callback
+    
+    def emit(self, record):
+        # Records come from the simulation worker thread; Tk widgets are only
+        # touched from the Tk thread, so each line is handed over with after()
+        try:
+            self.root.after(0, self.callback, self.format(record) + '\n')
+        except Exception:
+            self.handleError(record)
+
+def _percent(value):
+    # Form fields hold percentages, the simulator takes fractions
+    return float(value) / 100
 
 class PortfolioSimulatorGUI:
+    # Simulation options read from the form: (option name, Tk variable attribute, parser)
+    _SIM_ARGS = (
+        ('start_year', 'start_year_var', int),
+        ('end_year', 'end_year_var', int),
+        ('initial_value', 'initial_value_var', float),
+        ('protection_level', 'protection_level_var', _percent),
+        ('withdrawal_rate', 'withdrawal_rate_var', _percent),
+        ('withdrawal_type', 'withdrawal_type_var', str),
+        ('initial_age', 'initial_age_var', int),
+        ('trad_sp500', 'trad_sp500_var', _percent),
+        ('trad_bonds', 'trad_bonds_var', _percent),
+        ('struct_sp500', 'struct_sp500_var', _percent),
+        ('struct_bonds', 'struct_bonds_var', _percent),
+        ('struct_notes', 'struct_notes_var', _percent),
+        ('sp500_file', 'sp500_file_var', str),
+        ('bond_file', 'bond_file_var', str),
+        ('notes_file', 'notes_file_var', str),
+        ('output_dir', 'output_dir_var', str),
+        ('plot', 'plot_var', bool),
+    )
+    
+    # Rows of the summary table: (label, summary column, format)
+    _SUMMARY_ROWS = (
+        ('Initial Value', 'initial_value', '${:,.2f}'),
+        ('Final Value', 'final_value', '${:,.2f}'),
+        ('Total Return', 'total_return', '{:.2%}'),
+        ('CAGR', 'cagr', '{:.2%}'),
+        ('Volatility', 'volatility', '{:.2%}'),
+        ('Max Drawdown', 'max_drawdown', '{:.2%}'),
+    )
+    
     def __init__(self, root):
         self.root = root
+        self._running = False
+        # (canvas, image, toolbar) of the plot shown in each results tab
+        self._plot_views = {}
         self.root.title("HALO Portfolio Simulator")
         self.root.geometry("1200x900")  # Increased height from 800 to 900
         self.root.resizable(True, True)
@@ -68,11 +124,39 @@ class PortfolioSimulatorGUI:
         # Setup the input form
         self.create_setup_form()
         
-        # Setup the results view (initially empty)
-        self.create_results_view()
+        # Setup the results view the first time its tab is shown
+        self._results_built = False
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+        
+        # Show the simulator's log messages in the log view while it runs
+        log_handler = _TkLogHandler(self.root, self._append_log)
+        log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', '%H:%M:%S'))
+        sim_logger = logging.getLogger('src')
+        sim_logger.setLevel(logging.INFO)
+        sim_logger.addHandler(log_handler)
+        
+        # Parse the form fields as they change
+        self._bind_parsed_inputs()
         
         # Set default values
         self.set_default_values()
+        
+        # Load the simulator while the user fills in the form
+        threading.Thread(target=self._warm_caches, daemon=True).start()
+    
+    def _warm_caches(self):
+        # Runs on a worker thread; imports the simulation and plotting stack and
+        # sets up the compiled kernels so the first run starts at full speed
+        try:
+            import run_simulation
+            from src._kernels import warmup
+            warmup()
+            
+            import matplotlib.pyplot
+            from matplotlib.backends import backend_tkagg
+        except Exception:
+            # Any problem is reported when a simulation is actually run
+            pass
     
     def configure_styles(self):
         # Configure ttk styles
@@ -116,6 +200,18 @@ class PortfolioSimulatorGUI:
                        foreground=self.colors["primary"], 
                        font=('Helvetica', 14, 'bold'),  # Increased from 12 to 14
                        padding=(5, 10, 5, 10))
+        
+        # Browse buttons are plain tk Buttons named 'browse'; their look is set
+        # once in the option database instead of on every button
+        for option, value in (('font', 'Helvetica 11'),
+                              ('background', self.colors["primary"]),
+                              ('foreground', 'black'),
+                              ('activeBackground', self.colors["secondary"]),
+                              ('activeForeground', 'black')):
+            self.root.option_add(f'*browse.{option}', value)
+    
+    def _browse_button(self, parent, command):
+        return tk.Button(parent, name='browse', text="Browse", command=command)
     
     def create_setup_form(self):
         # Create a container frame with two main areas (sidebar and content)
@@ -149,20 +245,20 @@ class PortfolioSimulatorGUI:
         run_frame.pack(fill='x', pady=10, padx=10)
         
         # Add rocket ship emoji and make button bigger and more eye-catching
-        run_button = tk.Button(run_frame, 
-                              text="🚀 Run Simulation 🚀", 
-                              command=self.run_simulation,
-                              font=('Helvetica', 18, 'bold'),  # Even larger font
-                              background="#FF5722",  # Bright orange color for more pop
-                              foreground='black',  # Changed from white to black
-                              activebackground="#E64A19",  # Darker orange when clicked
-                              activeforeground='black',  # Changed from white to black
-                              relief=tk.RAISED,
-                              bd=2,
-                              padx=15,  
-                              pady=12,  # Increased padding
-                              height=2)
-        run_button.pack(fill='x')
+        self.run_button = tk.Button(run_frame, 
+                                   text="🚀 Run Simulation 🚀", 
+                                   command=self.run_simulation,
+                                   font=('Helvetica', 18, 'bold'),  # Even larger font
+                                   background="#FF5722",  # Bright orange color for more pop
+                                   foreground='black',  # Changed from white to black
+                                   activebackground="#E64A19",  # Darker orange when clicked
+                                   activeforeground='black',  # Changed from white to black
+                                   relief=tk.RAISED,
+                                   bd=2,
+                                   padx=15,  
+                                   pady=12,  # Increased padding
+                                   height=2)
+        self.run_button.pack(fill='x')
         
         # SIMULATION PARAMETERS SECTION
         sim_params_frame = ttk.LabelFrame(sidebar, text="Simulation Parameters", padding=10)
@@ -286,15 +382,7 @@ class PortfolioSimulatorGUI:
         ttk.Label(sp_file_frame, text="S&P 500 Returns:").pack(side=tk.LEFT)
         self.sp500_file_var = tk.StringVar()
         ttk.Entry(sp_file_frame, textvariable=self.sp500_file_var).pack(side=tk.LEFT, fill='x', expand=True, padx=(5, 5))
-        # Use regular tk Button for consistent styling
-        tk.Button(sp_file_frame, 
-                 text="Browse", 
-                 command=lambda: self.browse_file(self.sp500_file_var),
-                 font=('Helvetica', 11),
-                 background=self.colors["primary"],
-                 foreground='black',
-                 activebackground=self.colors["secondary"],
-                 activeforeground='black').pack(side=tk.RIGHT)
+        self._browse_button(sp_file_frame, lambda: self.browse_file(self.sp500_file_var)).pack(side=tk.RIGHT)
         
         # Bond File
         bond_file_frame = ttk.Frame(files_frame)
@@ -302,15 +390,7 @@ class PortfolioSimulatorGUI:
         ttk.Label(bond_file_frame, text="Bond Returns:").pack(side=tk.LEFT)
         self.bond_file_var = tk.StringVar()
         ttk.Entry(bond_file_frame, textvariable=self.bond_file_var).pack(side=tk.LEFT, fill='x', expand=True, padx=(5, 5))
-        # Use regular tk Button for consistent styling
-        tk.Button(bond_file_frame, 
-                 text="Browse", 
-                 command=lambda: self.browse_file(self.bond_file_var),
-                 font=('Helvetica', 11),
-                 background=self.colors["primary"],
-                 foreground='black',
-                 activebackground=self.colors["secondary"],
-                 activeforeground='black').pack(side=tk.RIGHT)
+        self._browse_button(bond_file_frame, lambda: self.browse_file(self.bond_file_var)).pack(side=tk.RIGHT)
         
         # Notes File
         notes_file_frame = ttk.Frame(files_frame)
@@ -318,15 +398,7 @@ class PortfolioSimulatorGUI:
         ttk.Label(notes_file_frame, text="Structured Notes:").pack(side=tk.LEFT)
         self.notes_file_var = tk.StringVar()
         ttk.Entry(notes_file_frame, textvariable=self.notes_file_var).pack(side=tk.LEFT, fill='x', expand=True, padx=(5, 5))
-        # Use regular tk Button for consistent styling
-        tk.Button(notes_file_frame, 
-                 text="Browse", 
-                 command=lambda: self.browse_file(self.notes_file_var),
-                 font=('Helvetica', 11),
-                 background=self.colors["primary"],
-                 foreground='black',
-                 activebackground=self.colors["secondary"],
-                 activeforeground='black').pack(side=tk.RIGHT)
+        self._browse_button(notes_file_frame, lambda: self.browse_file(self.notes_file_var)).pack(side=tk.RIGHT)
         
         # Output Directory
         ttk.Label(files_frame, text="Output Directory", style="SectionHeader.TLabel").pack(fill='x', pady=(15, 10))
@@ -336,21 +408,36 @@ class PortfolioSimulatorGUI:
         ttk.Label(dir_frame, text="Results Directory:").pack(side=tk.LEFT)
         self.output_dir_var = tk.StringVar()
         ttk.Entry(dir_frame, textvariable=self.output_dir_var).pack(side=tk.LEFT, fill='x', expand=True, padx=(5, 5))
-        # Use regular tk Button for consistent styling
-        tk.Button(dir_frame, 
-                 text="Browse", 
-                 command=self.browse_directory,
-                 font=('Helvetica', 11),
-                 background=self.colors["primary"],
-                 foreground='black',
-                 activebackground=self.colors["secondary"],
-                 activeforeground='black').pack(side=tk.RIGHT)
+        self._browse_button(dir_frame, self.browse_directory).pack(side=tk.RIGHT)
         
         # Generate Plots
         plot_frame = ttk.Frame(files_frame)
         plot_frame.pack(fill='x', pady=10)
         self.plot_var = tk.BooleanVar()
         ttk.Checkbutton(plot_frame, text="Generate Plots", variable=self.plot_var).pack(side=tk.LEFT)
+        
+        # Simulation log, filled while a simulation runs
+        log_frame = ttk.LabelFrame(content, text="Simulation Log", padding=10)
+        log_frame.pack(fill='both', expand=True, pady=10, padx=10)
+        self.log_text = tk.Text(log_frame, height=10, wrap='none', state='disabled', font=('Courier', 10))
+        self.log_text.pack(fill='both', expand=True)
+    
+    def _append_log(self, message):
+        # Keep only the last LOG_VIEW_MAX_LINES lines so a long run cannot grow the view unbounded
+        self.log_text.config(state='normal')
+        self.log_text.insert('end', message)
+        self.log_text.delete('1.0', f'end - {LOG_VIEW_MAX_LINES} lines')
+        self.log_text.config(state='disabled')
+        self.log_text.see('end')
+    
+    def _on_tab_changed(self, event):
+        if self.notebook.select() == str(self.results_tab):
+            self._ensure_results_view()
+    
+    def _ensure_results_view(self):
+        if not self._results_built:
+            self.create_results_view()
+            self._results_built = True
     
     def create_results_view(self):
         # Create a container frame with sidebar and main content
@@ -482,252 +569,228 @@ class PortfolioSimulatorGUI:
         if directory:
             self.output_dir_var.set(directory)
     
+    def _bind_parsed_inputs(self):
+        # Each field is parsed whenever it is written, so a run reads typed values
+        # from self._nums instead of reading and parsing every field again
+        self._nums = {}
+        for name, attr, parse in self._SIM_ARGS:
+            var = getattr(self, attr)
+            var.trace_add('write', lambda *args, name=name, var=var, parse=parse: self._parse_input(name, var, parse))
+            self._parse_input(name, var, parse)
+    
+    def _parse_input(self, name, var, parse):
+        # Invalid values are kept as their error and reported by validate_inputs
+        try:
+            self._nums[name] = parse(var.get())
+        except ValueError as e:
+            self._nums[name] = e
+    
     def validate_inputs(self):
+        # Returns the parsed simulation options, or None if an input is invalid
         try:
-            # Check numerical values
-            start_year = int(self.start_year_var.get())
-            end_year = int(self.end_year_var.get())
-            initial_value = float(self.initial_value_var.get())
-            protection_level = float(self.protection_level_var.get()) / 100  # Convert from percentage
-            withdrawal_rate = float(self.withdrawal_rate_var.get()) / 100  # Convert from percentage
-            
-            # Check allocation percentages
-            trad_sp500 = float(self.trad_sp500_var.get()) / 100
-            trad_bonds = float(self.trad_bonds_var.get()) / 100
-            struct_sp500 = float(self.struct_sp500_var.get()) / 100
-            struct_bonds = float(self.struct_bonds_var.get()) / 100
-            struct_notes = float(self.struct_notes_var.get()) / 100
+            # Check numerical values; fields were parsed as they were edited
+            params = dict(self._nums)
+            for value in params.values():
+                if isinstance(value, ValueError):
+                    raise value
             
             # Check that allocations sum to 100%
-            if not np.isclose(trad_sp500 + trad_bonds, 1.0, atol=0.01):
+            if abs(params['trad_sp500'] + params['trad_bonds'] - 1.0) > 0.01:
                 messagebox.showerror("Invalid Input", "Traditional portfolio allocations must sum to 100%")
-                return False
+                return None
             
-            if not np.isclose(struct_sp500 + struct_bonds + struct_notes, 1.0, atol=0.01):
+            if abs(params['struct_sp500'] + params['struct_bonds'] + params['struct_notes'] - 1.0) > 0.01:
                 messagebox.showerror("Invalid Input", "Structured portfolio allocations must sum to 100%")
-                return False
+                return None
             
             # Check file paths
-            for path_var in [self.sp500_file_var, self.bond_file_var, self.notes_file_var]:
-                if not os.path.exists(path_var.get()):
-                    messagebox.showerror("File Not Found", f"File not found: {path_var.get()}")
-                    return False
+            for path in [params['sp500_file'], params['bond_file'], params['notes_file']]:
+                if not os.path.exists(path):
+                    messagebox.showerror("File Not Found", f"File not found: {path}")
+                    return None
             
             # Check output directory
-            if not os.path.exists(self.output_dir_var.get()):
+            if not os.path.exists(params['output_dir']):
                 # Ask if we should create it
                 if messagebox.askyesno("Create Directory", f"Output directory does not exist. Create it?"):
-                    os.makedirs(self.output_dir_var.get())
+                    os.makedirs(params['output_dir'])
                 else:
-                    return False
+                    return None
             
-            return True
+            return params
         
         except ValueError as e:
             messagebox.showerror("Invalid Input", f"Please check your inputs: {str(e)}")
-            return False
+            return None
     
     def run_simulation(self):
-        if not self.validate_inputs():
+        # Ignore clicks while a simulation is already running
+        if self._running:
+            return
+        
+        params = self.validate_inputs()
+        if params is None:
             return
         
-        # Build the command
-        cmd = [
-            "python3", "run_simulation.py",
-            "--start_year", self.start_year_var.get(),
-            "--end_year", self.end_year_var.get(),
-            "--initial_value", self.initial_value_var.get(),
-            "--protection_level", str(float(self.protection_level_var.get()) / 100),
-            "--withdrawal_rate", str(float(self.withdrawal_rate_var.get()) / 100),
-            "--withdrawal_type", self.withdrawal_type_var.get(),
-            "--initial_age", self.initial_age_var.get(),
-            "--trad_sp500", str(float(self.trad_sp500_var.get()) / 100),
-            "--trad_bonds", str(float(self.trad_bonds_var.get()) / 100),
-            "--struct_sp500", str(float(self.struct_sp500_var.get()) / 100),
-            "--struct_bonds", str(float(self.struct_bonds_var.get()) / 100),
-            "--struct_notes", str(float(self.struct_notes_var.get()) / 100),
-            "--sp500_file", self.sp500_file_var.get(),
-            "--bond_file", self.bond_file_var.get(),
-            "--notes_file", self.notes_file_var.get(),
-            "--output_dir", self.output_dir_var.get()
-        ]
-        
-        if self.plot_var.get():
-            cmd.append("--plot")
-        
-        # Run the simulation
+        # Clear the log of the previous run
+        self.log_text.config(state='normal')
+        self.log_text.delete('1.0', 'end')
+        self.log_text.config(state='disabled')
+        
+        # Run the simulation in the background so the window stays responsive
+        self._running = True
+        self.run_button.config(state='disabled')
+        self.root.config(cursor="wait")
+        
+        threading.Thread(target=self._run_worker, args=(params,), daemon=True).start()
+    
+    def _run_worker(self, params):
+        # Runs on a worker thread; the result is handed back to the Tk thread
         try:
-            self.root.config(cursor="wait")
-            self.root.update()
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                messagebox.showerror("Simulation Error", f"Error running simulation:\n{result.stderr}")
-                self.root.config(cursor="")
-                return
-            
-            # Show success message
-            messagebox.showinfo("Success", "Simulation completed successfully!")
-            
-            # Switch to results tab
-            self.notebook.select(self.results_tab)
-            
-            # Load and display results
-            self.load_results()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-        finally:
-            self.root.config(cursor="")
+            # Imported on first use so the window opens without loading pandas and matplotlib
+            import run_simulation as rs
+            rs.run(**params)
+        except Exception:
+            self.root.after(0, self._on_sim_done, traceback.format_exc())
+        else:
+            self.root.after(0, self._on_sim_done, None)
+    
+    def _on_sim_done(self, error):
+        self._running = False
+        self.run_button.config(state='normal')
+        self.root.config(cursor="")
+        
+        if error is not None:
+            messagebox.showerror("Simulation Error", f"Error running simulation:\n{error}")
+            return
+        
+        # Show success message
+        messagebox.showinfo("Success", "Simulation completed successfully!")
+        
+        # Switch to results tab
+        self.notebook.select(self.results_tab)
+        
+        # Load and display results
+        self.load_results()
     
     def load_results(self):
+        self._ensure_results_view()
+        
         # Find the most recent simulation results
         output_dir = self.output_dir_var.get()
         
-        # Look for the most recent files
-        results_files = [f for f in os.listdir(output_dir) if f.startswith('simulation_results_')]
-        summary_files = [f for f in os.listdir(output_dir) if f.startswith('simulation_summary_')]
-        portfolio_plot_files = [f for f in os.listdir(output_dir) if f.startswith('portfolio_values_')]
-        returns_plot_files = [f for f in os.listdir(output_dir) if f.startswith('annual_returns_')]
-        
-        if not results_files or not summary_files:
+        # Find the most recently modified file of each kind in one pass over the directory
+        latest = {'simulation_results_': None, 'simulation_summary_': None,
+                  'portfolio_values_': None, 'annual_returns_': None}
+        latest_mtime = dict.fromkeys(latest, float('-inf'))
+        with os.scandir(output_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                for prefix in latest:
+                    if entry.name.startswith(prefix):
+                        mtime = entry.stat().st_mtime
+                        if mtime > latest_mtime[prefix]:
+                            latest[prefix] = entry.name
+                            latest_mtime[prefix] = mtime
+                        break
+        
+        if latest['simulation_results_'] is None or latest['simulation_summary_'] is None:
             messagebox.showwarning("No Results", "No simulation results found in the output directory.")
             return
         
-        # Get the most recent files
-        results_file = sorted(results_files)[-1]
-        summary_file = sorted(summary_files)[-1]
-        portfolio_plot = sorted(portfolio_plot_files)[-1] if portfolio_plot_files else None
-        returns_plot = sorted(returns_plot_files)[-1] if returns_plot_files else None
+        summary_file = latest['simulation_summary_']
+        portfolio_plot = latest['portfolio_values_']
+        returns_plot = latest['annual_returns_']
         
         # Load summary statistics
         try:
-            summary_df = pd.read_csv(os.path.join(output_dir, summary_file))
+            import pandas as pd
+            summary_df = pd.read_csv(os.path.join(output_dir, summary_file), index_col=0)
             
-            # Update summary treeview
-            self.summary_tree.delete(*self.summary_tree.get_children())
-            
-            # Extract data for each portfolio type
-            trad_data = summary_df[summary_df.iloc[:, 0] == 'traditional'].iloc[0] if 'traditional' in summary_df.iloc[:, 0].values else None
-            struct_data = summary_df[summary_df.iloc[:, 0] == 'structured'].iloc[0] if 'structured' in summary_df.iloc[:, 0].values else None
-            
-            # Add rows for each statistic if we have data
-            if trad_data is not None and struct_data is not None:
-                # Initial Value
-                self.summary_tree.insert('', 'end', values=(
-                    'Initial Value', 
-                    f"${float(trad_data['initial_value']):,.2f}", 
-                    f"${float(struct_data['initial_value']):,.2f}"
-                ))
-                
-                # Final Value
-                self.summary_tree.insert('', 'end', values=(
-                    'Final Value', 
-                    f"${float(trad_data['final_value']):,.2f}", 
-                    f"${float(struct_data['final_value']):,.2f}"
-                ))
-                
-                # Total Return
-                self.summary_tree.insert('', 'end', values=(
-                    'Total Return', 
-                    f"{float(trad_data['total_return']):.2%}", 
-                    f"{float(struct_data['total_return']):.2%}"
-                ))
-                
-                # CAGR
-                self.summary_tree.insert('', 'end', values=(
-                    'CAGR', 
-                    f"{float(trad_data['cagr']):.2%}", 
-                    f"{float(struct_data['cagr']):.2%}"
-                ))
-                
-                # Volatility
-                self.summary_tree.insert('', 'end', values=(
-                    'Volatility', 
-                    f"{float(trad_data['volatility']):.2%}", 
-                    f"{float(struct_data['volatility']):.2%}"
-                ))
-                
-                # Max Drawdown
-                self.summary_tree.insert('', 'end', values=(
-                    'Max Drawdown', 
-                    f"{float(trad_data['max_drawdown']):.2%}", 
-                    f"{float(struct_data['max_drawdown']):.2%}"
-                ))
-            
-            # Clear existing plots
-            for widget in self.portfolio_tab.winfo_children():
-                widget.destroy()
-            for widget in self.returns_tab.winfo_children():
-                widget.destroy()
+            # Format each statistic for both portfolios at once if we have data
+            rows = []
+            if 'traditional' in summary_df.index and 'structured' in summary_df.index:
+                portfolios = summary_df.loc[['traditional', 'structured']]
+                rows = [(label, *portfolios[column].astype(float).map(fmt.format))
+                        for label, column, fmt in self._SUMMARY_ROWS]
             
-            # Add headers to the tabs
-            ttk.Label(self.portfolio_tab, 
-                     text="Portfolio Values Over Time", 
-                     style="Header.TLabel").pack(pady=(10, 5))
-            
-            ttk.Label(self.returns_tab, 
-                     text="Annual Portfolio Returns", 
-                     style="Header.TLabel").pack(pady=(10, 5))
+            # Update summary treeview; only Tk calls are left, so it is redrawn once
+            self.summary_tree.delete(*self.summary_tree.get_children())
+            for row in rows:
+                self.summary_tree.insert('', 'end', values=row)
             
             # Display plots if available
             if self.plot_var.get() and portfolio_plot and returns_plot:
-                # Portfolio values plot - make it fill the space better
-                portfolio_fig = plt.Figure(figsize=(14, 9), dpi=100)
-                portfolio_ax = portfolio_fig.add_subplot(111)
-                
-                # Load and display the image with higher quality
-                portfolio_img = plt.imread(os.path.join(output_dir, portfolio_plot))
-                portfolio_ax.imshow(portfolio_img, aspect='auto')
-                portfolio_ax.axis('off')
-                
-                # Create canvas for portfolio plot
-                portfolio_canvas = FigureCanvasTkAgg(portfolio_fig, master=self.portfolio_tab)
-                portfolio_canvas.draw()
-                portfolio_canvas_widget = portfolio_canvas.get_tk_widget()
-                portfolio_canvas_widget.pack(fill='both', expand=True, padx=5, pady=5)
-                
-                # Create an interactive toolbar
-                from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
-                toolbar_frame = tk.Frame(self.portfolio_tab)
-                toolbar_frame.pack(fill='x', padx=5)
-                toolbar = NavigationToolbar2Tk(portfolio_canvas, toolbar_frame)
-                toolbar.update()
-                
-                # Annual returns plot - make it fill the space better
-                returns_fig = plt.Figure(figsize=(14, 9), dpi=100)
-                returns_ax = returns_fig.add_subplot(111)
-                
-                # Load and display the image with higher quality
-                returns_img = plt.imread(os.path.join(output_dir, returns_plot))
-                returns_ax.imshow(returns_img, aspect='auto')
-                returns_ax.axis('off')
-                
-                # Create canvas for returns plot
-                returns_canvas = FigureCanvasTkAgg(returns_fig, master=self.returns_tab)
-                returns_canvas.draw()
-                returns_canvas_widget = returns_canvas.get_tk_widget()
-                returns_canvas_widget.pack(fill='both', expand=True, padx=5, pady=5)
-                
-                # Create an interactive toolbar
-                toolbar_frame = tk.Frame(self.returns_tab)
-                toolbar_frame.pack(fill='x', padx=5)
-                toolbar = NavigationToolbar2Tk(returns_canvas, toolbar_frame)
-                toolbar.update()
-                
+                self._show_plot(self.portfolio_tab, "Portfolio Values Over Time",
+                                os.path.join(output_dir, portfolio_plot))
+                self._show_plot(self.returns_tab, "Annual Portfolio Returns",
+                                os.path.join(output_dir, returns_plot))
             else:
-                message_style = {'font': ('Helvetica', 14, 'italic'), 'fg': self.colors['primary']}
-                ttk.Label(self.portfolio_tab, 
-                         text="No plots available. Run simulation with 'Generate Plots' option.",
-                         font=('Helvetica', 14, 'italic')).pack(pady=150)
-                ttk.Label(self.returns_tab, 
-                         text="No plots available. Run simulation with 'Generate Plots' option.",
-                         font=('Helvetica', 14, 'italic')).pack(pady=150)
+                for tab, title in ((self.portfolio_tab, "Portfolio Values Over Time"),
+                                   (self.returns_tab, "Annual Portfolio Returns")):
+                    self._reset_plot_tab(tab, title)
+                    ttk.Label(tab, 
+                             text="No plots available. Run simulation with 'Generate Plots' option.",
+                             font=('Helvetica', 14, 'italic')).pack(pady=150)
         
         except Exception as e:
             messagebox.showerror("Error", f"Error loading results: {str(e)}")
     
+    def _reset_plot_tab(self, tab, title):
+        # Clear the tab and add its header
+        for widget in tab.winfo_children():
+            widget.destroy()
+        self._plot_views.pop(tab, None)
+        
+        ttk.Label(tab, 
+                 text=title, 
+                 style="Header.TLabel").pack(pady=(10, 5))
+    
+    def _show_plot(self, tab, title, image_path):
+        from matplotlib.image import imread
+        
+        img = imread(image_path)
+        height, width = img.shape[:2]
+        
+        # Swap the new image into the tab's existing canvas instead of rebuilding it
+        view = self._plot_views.get(tab)
+        if view is not None:
+            canvas, image, toolbar = view
+            image.set_data(img)
+            image.set_extent((-0.5, width - 0.5, height - 0.5, -0.5))
+            image.axes.set_xlim(-0.5, width - 0.5)
+            image.axes.set_ylim(height - 0.5, -0.5)
+            toolbar.update()  # Drop the zoom history of the previous image
+            canvas.draw_idle()
+            return
+        
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        
+        self._reset_plot_tab(tab, title)
+        
+        # Plot figure - make it fill the space better
+        fig = Figure(figsize=(14, 9), dpi=100)
+        ax = fig.add_subplot(111)
+        
+        # Display the image with higher quality
+        image = ax.imshow(img, aspect='auto')
+        ax.axis('off')
+        
+        # Create canvas for the plot
+        canvas = FigureCanvasTkAgg(fig, master=tab)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+        
+        # Create an interactive toolbar
+        toolbar_frame = tk.Frame(tab)
+        toolbar_frame.pack(fill='x', padx=5)
+        toolbar = NavigationToolbar2Tk(canvas, toolbar_frame)
+        toolbar.update()
+        
+        self._plot_views[tab] = (canvas, image, toolbar)
+    
     def open_results_folder(self):
         output_dir = self.output_dir_var.get()
         if os.path.exists(output_dir):
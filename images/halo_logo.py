@@ -2,11 +2,16 @@
 HALO logo image stored as base64 string for easy embedding in the application.
 """
 
+import base64
+
 # The HALO logo image as a base64 encoded string
 HALO_LOGO_BASE64 = """
 iVBORw0KGgoAAAANSUhEUgAAAH8AAAB/CAYAAADGvR0TAAAACXBIWXMAAAsTAAALEwEAmpwYAAABM0lEQVR4nO3dQW7CMBRF0TTp/jdJdyBKJRUFGwTl2O+cDTBR5N8/cN3TQ5IkSZIkSQcYY7zUe6j3XO9NxKvvt97P4TjgV8Q4rV+B/2J4+Ar8C2f9a/gHnVd/fQU+fPjw4cOHDx8+fPjw4cOHDx8+fPjw4cOHDx8+fPjw4cOHDx8+fPjw4cOHf9vPQ5fm7Z89x/jtGBfwx0Xl+9/v5fLMXRZ8+PDhw4ffjr9cVF5fR+DDhw8fPnz48Ncfo27d27/l3P/yvP3L4x+Kzxv+xyMwAh8+fPjw4cOHDx8+fPjw4cOHDx8+fPjw4cOHDx8+fPjw4cOHDx8+fPjw4beKtxzPCHwG/dVXJT58+PDhw4ffKt5yPMNF5V8O7vDXQF/eNPtV+Q54OkmSJEnSxd4BEyAeA+yrRBwAAAAASUVORK5CYII=
 """
 
+# Decoded once at import so callers get the image bytes without per-call work
+_HALO_LOGO_BYTES = base64.b64decode("".join(HALO_LOGO_BASE64.split()))
+
 def get_halo_logo_data():
-    """Returns the base64 encoded HALO logo image data."""
-    return HALO_LOGO_BASE64 
\ No newline at end of file
+    """Returns the decoded HALO logo image data (PNG bytes)."""
+    return _HALO_LOGO_BYTES 
\ No newline at end of file
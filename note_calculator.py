@@ -1,11 +1,23 @@
+import math
 import pandas as pd
 import numpy as np
 import os
-from scipy.stats import norm
+import sys
+from scipy.special import ndtr
 import logging
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # numba is optional; notes are then priced with the vectorized SciPy functions
+    NUMBA_AVAILABLE = False
+
+# numba cannot cache functions whose source file is missing, as in a PyInstaller bundle
+CACHE_KERNELS = not getattr(sys, 'frozen', False) and os.path.isfile(__file__) and __file__.endswith('.py')
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,7 +29,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
-# Black-Scholes functions (unchanged)
+# Protection levels priced for every year
+PROTECTION_LEVELS = (0.05, 0.10, 0.15, 0.20)
+
+# Black-Scholes functions; all arguments may be scalars or broadcastable NumPy arrays
+def black_scholes_call_put(S, K_call, K_put, T, r, sigma, div_yield, iv_factor=1.0):
+    """
+    Black-Scholes call and put prices on the same underlying, with continuous dividend yield
+    
+    The dividend-adjusted price, discount factor and volatility terms are computed
+    once for both options. Returns (call_price, put_price).
+    """
+    adjusted_sigma = sigma * iv_factor
+    # Adjust stock price for dividends
+    S_adj = S * np.exp(-div_yield * T)  # Present value of stock ex-dividends
+    vol_sqrt_t = adjusted_sigma * np.sqrt(T)
+    drift = (r + 0.5 * adjusted_sigma**2) * T
+    discount = np.exp(-r * T)
+    
+    d1 = (np.log(S_adj / K_call) + drift) / vol_sqrt_t
+    call_price = S_adj * ndtr(d1) - K_call * discount * ndtr(d1 - vol_sqrt_t)
+    
+    d1 = (np.log(S_adj / K_put) + drift) / vol_sqrt_t
+    put_price = K_put * discount * ndtr(vol_sqrt_t - d1) - S_adj * ndtr(-d1)
+    return call_price, put_price
+
 def black_scholes_call(S, K, T, r, sigma, div_yield, iv_factor=1.0):
     """
     Black-Scholes call option price with continuous dividend yield
@@ -28,64 +64,83 @@ def black_scholes_call(S, K, T, r, sigma, div_yield, iv_factor=1.0):
     sigma: Volatility
     div_yield: Continuous dividend yield
     """
-    adjusted_sigma = sigma * iv_factor
-    # Adjust stock price for dividends
-    S_adj = S * np.exp(-div_yield * T)  # Present value of stock ex-dividends
-    
-    d1 = (np.log(S_adj / K) + (r + 0.5 * adjusted_sigma**2) * T) / (adjusted_sigma * np.sqrt(T))
-    d2 = d1 - adjusted_sigma * np.sqrt(T)
-    
-    call_price = S_adj * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
-    logger.debug(f"Call Price: S={S}, K={K}, T={T}, r={r}, sigma={adjusted_sigma}, call_price={call_price}")
-    return call_price
+    return black_scholes_call_put(S, K, K, T, r, sigma, div_yield, iv_factor)[0]
 
 def black_scholes_put(S, K, T, r, sigma, div_yield, iv_factor=1.0):
     """
     Black-Scholes put option price with continuous dividend yield
     """
-    adjusted_sigma = sigma * iv_factor
-    # Adjust stock price for dividends
-    S_adj = S * np.exp(-div_yield * T)  # Present value of stock ex-dividends
-    
-    d1 = (np.log(S_adj / K) + (r + 0.5 * adjusted_sigma**2) * T) / (adjusted_sigma * np.sqrt(T))
-    d2 = d1 - adjusted_sigma * np.sqrt(T)
-    
-    put_price = K * np.exp(-r * T) * norm.cdf(-d2) - S_adj * norm.cdf(-d1)
-    logger.debug(f"Put Price: S={S}, K={K}, T={T}, r={r}, sigma={adjusted_sigma}, put_price={put_price}")
-    return put_price
+    return black_scholes_call_put(S, K, K, T, r, sigma, div_yield, iv_factor)[1]
 
 def calculate_participation_rate(start_price, rf_rate, sigma, protection_level, term=1.0, iv_factor=0.90, funding_spread=0.015, div_yield=0.02):
     """
     Calculate participation rate using Black-Scholes and funding costs
+    
+    All market inputs and the protection level may be NumPy arrays; they are
+    broadcast against each other and the rates are returned as an array.
     """
     # Separate funding cost from dividend yield in option pricing
     funding_rf = rf_rate + funding_spread  # Funding cost
     
-    # Log input parameters
-    logger.info(f"\nCalculating participation rate:")
-    logger.info(f"  RF Rate: {rf_rate:.4f}")
-    logger.info(f"  Funding Spread: {funding_spread:.4f}")
-    logger.info(f"  Dividend Yield: {div_yield:.4f}")
-    logger.info(f"  Total Funding: {funding_rf:.4f}")
-    
     # Calculate bond price using funding cost
     bond_price = 1.0 / (1 + funding_rf) ** term
     bond_capital = 1.0 - bond_price
     
     # Option calculations using separate rates
     K_put = start_price * (1 - protection_level)
-    put_premium = black_scholes_put(start_price, K_put, term, rf_rate, sigma, div_yield, iv_factor)
-    call_price = black_scholes_call(start_price, start_price, term, rf_rate, sigma, div_yield, iv_factor)
-    
-    # Dynamic IV factor based on market conditions
-    crisis_iv_factor = min(1.0, 0.90 + max(0, (sigma - 0.20) * 0.5))  # Increase IV factor during high vol
+    call_price, put_premium = black_scholes_call_put(start_price, start_price, K_put, term, rf_rate,
+                                                     sigma, div_yield, iv_factor)
     
     total_available = bond_capital + (put_premium / start_price)
     participation = total_available / (call_price / start_price)
-    participation = min(participation, 2.0)
+    participation = np.minimum(participation, 2.0)
     
     return participation
 
+if NUMBA_AVAILABLE:
+    # Compiled lazily and cached under __pycache__ (except in frozen builds), since pandas may hand the kernel read-only arrays
+    @njit(cache=CACHE_KERNELS, fastmath=True)
+    def _norm_cdf(x):
+        """Standard normal CDF, the same function as scipy.special.ndtr."""
+        return 0.5 * math.erfc(-x / math.sqrt(2.0))
+    
+    @njit(cache=CACHE_KERNELS, fastmath=True)
+    def _participation_grid(start_price, rf_rate, sigma, funding_spread, div_yield, protection_levels,
+                            term, iv_factor):
+        """
+        Compiled calculate_participation_rate for every year and protection level
+        
+        start_price, rf_rate, sigma, funding_spread, div_yield: Arrays with one value per year
+        protection_levels: Array of protection levels
+        Returns an array of participation rates with shape (years, protection levels)
+        """
+        n_years = start_price.shape[0]
+        n_levels = protection_levels.shape[0]
+        participation = np.empty((n_years, n_levels))
+        sqrt_t = math.sqrt(term)
+        for i in range(n_years):
+            S = start_price[i]
+            r = rf_rate[i]
+            
+            # Terms shared by the call and all puts of the year
+            vol = sigma[i] * iv_factor
+            vol_sqrt_t = vol * sqrt_t
+            S_adj = S * math.exp(-div_yield[i] * term)
+            discount = math.exp(-r * term)
+            drift = (r + 0.5 * vol * vol) * term
+            bond_capital = 1.0 - 1.0 / (1.0 + r + funding_spread[i]) ** term
+            
+            # The at-the-money call does not depend on the protection level
+            d1 = (math.log(S_adj / S) + drift) / vol_sqrt_t
+            call_price = S_adj * _norm_cdf(d1) - S * discount * _norm_cdf(d1 - vol_sqrt_t)
+            
+            for j in range(n_levels):
+                K_put = S * (1.0 - protection_levels[j])
+                d1 = (math.log(S_adj / K_put) + drift) / vol_sqrt_t
+                put_premium = K_put * discount * _norm_cdf(vol_sqrt_t - d1) - S_adj * _norm_cdf(-d1)
+                participation[i, j] = min((bond_capital + put_premium / S) / (call_price / S), 2.0)
+        return participation
+
 def simple_note_payoff(start_price, end_price, participation_rate, protection_level):
     underlying_return = (end_price - start_price) / start_price
     if underlying_return > 0:
@@ -95,6 +150,11 @@ def simple_note_payoff(start_price, end_price, participation_rate, protection_le
     else:
         return underlying_return + protection_level
 
+def _values_at(series, dates, default):
+    """Values of a series at the given dates, or the default for dates it does not contain."""
+    values = series.reindex(dates).to_numpy(dtype=float)
+    return np.where(dates.isin(series.index), values, default)
+
 def calculate_note_payoffs():
     try:
         # Load all required data
@@ -123,34 +183,43 @@ def calculate_note_payoffs():
         
         logger.info("Successfully loaded all market data including dividend yields")
         
-        # Calculate for each year and protection level
-        note_data = []
-        for start_date in sp500.index:
-            year = start_date.year  # Now this will work because start_date is a datetime
-            start_price = sp500[start_date]
-            rf_rate = treasury[start_date]
-            sigma = vix[start_date] if start_date in vix.index else 0.20
-            funding_spread = funding_spreads[start_date] if start_date in funding_spreads.index else 0.015
-            div_yield = div_yields[start_date] if start_date in div_yields.index else 0.02
-            
-            for protection_level in [0.05, 0.10, 0.15, 0.20]:
-                participation = calculate_participation_rate(
-                    start_price, rf_rate, sigma, protection_level, 
-                    term=1.0, iv_factor=0.90, funding_spread=funding_spread,
-                    div_yield=div_yield
-                )
-                note_data.append({
-                    "protection_level": protection_level,
-                    "term": 1.0,
-                    "underlying_asset": "S&P 500",
-                    "protection_type": "Buffer",
-                    "participation_rate": participation,
-                    "year": year,
-                    "volatility": sigma,
-                    "interest_rate": rf_rate,
-                    "funding_spread": funding_spread,
-                    "funding_source": "FRED TED" if start_date in funding_spreads.index else "default"
-                })
+        # Line up the market inputs with the S&P 500 dates
+        dates = sp500.index
+        start_price = sp500.to_numpy(dtype=float)
+        rf_rate = treasury.loc[dates].to_numpy(dtype=float)
+        sigma = _values_at(vix, dates, 0.20)
+        funding_spread = _values_at(funding_spreads, dates, 0.015)
+        div_yield = _values_at(div_yields, dates, 0.02)
+        has_funding = dates.isin(funding_spreads.index)
+        
+        # Price every year (rows) and protection level (columns) in one pass
+        protection_levels = np.array(PROTECTION_LEVELS)
+        logger.info(f"Calculating participation rates for {len(dates)} years and "
+                    f"{len(protection_levels)} protection levels")
+        if NUMBA_AVAILABLE:
+            participation = _participation_grid(start_price, rf_rate, sigma, funding_spread, div_yield,
+                                                protection_levels, 1.0, 0.90)
+        else:
+            participation = calculate_participation_rate(
+                start_price[:, None], rf_rate[:, None], sigma[:, None], protection_levels[None, :],
+                term=1.0, iv_factor=0.90, funding_spread=funding_spread[:, None],
+                div_yield=div_yield[:, None]
+            )
+        
+        # One row per year and protection level, years first
+        n_levels = len(protection_levels)
+        note_data = {
+            "protection_level": np.tile(protection_levels, len(dates)),
+            "term": 1.0,
+            "underlying_asset": "S&P 500",
+            "protection_type": "Buffer",
+            "participation_rate": participation.ravel(),
+            "year": np.repeat(dates.year, n_levels),
+            "volatility": np.repeat(sigma, n_levels),
+            "interest_rate": np.repeat(rf_rate, n_levels),
+            "funding_spread": np.repeat(funding_spread, n_levels),
+            "funding_source": np.repeat(np.where(has_funding, "FRED TED", "default"), n_levels)
+        }
 
         # Change the output directory to be within the current directory
         script_dir = os.path.dirname(os.path.abspath(__file__))
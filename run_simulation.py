@@ -3,10 +3,30 @@
 Portfolio Simulator - Command Line Interface
 
 This script serves as the main entry point for running portfolio simulations from the command line.
+It can also be imported, e.g. by the GUI, to run simulations in-process with run().
 """
 
 import sys
-from src.main import main
+from src.main import main, parse_arguments, run_simulation
+
+
+def run(**params):
+    """
+    Run a simulation in the current process.
+    
+    Parameters:
+    - params: Simulation options by their command line names (e.g. start_year=2008, plot=True);
+      options not given take their command line defaults
+    
+    Errors are raised to the caller instead of being logged.
+    """
+    args = parse_arguments([])
+    unknown = set(params) - set(vars(args))
+    if unknown:
+        raise TypeError(f"Unknown simulation options: {', '.join(sorted(unknown))}")
+    vars(args).update(params)
+    run_simulation(args)
+
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
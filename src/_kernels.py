@@ -0,0 +1,154 @@
+"""
+Compiled simulation kernels.
+
+With numba installed every kernel is compiled eagerly at import from its explicit
+signature and cached under __pycache__, so later sessions load the machine code
+instead of re-compiling it. Kernels only take arrays and scalars, which keeps the
+cache valid. Frozen builds (PyInstaller) ship no source for numba to cache against,
+so there the kernels are compiled without caching. Without numba they run as plain
+Python loops.
+"""
+import os
+import sys
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; without it the kernels run as plain Python loops
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# numba cannot cache functions whose source file is missing, as in a PyInstaller bundle
+CACHE_KERNELS = not getattr(sys, 'frozen', False) and os.path.isfile(__file__) and __file__.endswith('.py')
+
+
+@njit('float64[:](float64[:], float64[:], float64)', cache=CACHE_KERNELS, fastmath=True)
+def withdrawal_path(factors, withdrawals, initial_value):
+    """
+    Run the value recurrence v[t] = v[t-1] * f[t] - w[t].
+    
+    Withdrawals are capped at the value available, matching Portfolio.withdraw.
+    
+    Parameters:
+    - factors: Array of annual growth factors (1 + portfolio return)
+    - withdrawals: Array of annual withdrawal amounts
+    - initial_value: Portfolio value before the first year
+    
+    Returns:
+    - values: Array of year-end portfolio values after withdrawals
+    """
+    n_years = factors.shape[0]
+    values = np.empty(n_years)
+    value = initial_value
+    for t in range(n_years):
+        value = value * factors[t]
+        if withdrawals[t] > 0:
+            value -= min(withdrawals[t], value)
+        values[t] = value
+    return values
+
+
+@njit('Tuple((float64[:], float64[:], float64[:]))(float64[:, :], float64[:], float64, float64[:], float64[:])',
+      cache=CACHE_KERNELS, fastmath=True)
+def simulate_with_strategy(gross_returns, alloc_vec, initial_value, fixed_amounts, rates):
+    """
+    Simulate an annually rebalanced portfolio under a withdrawal strategy.
+    
+    Each year's withdrawal is w[t] = min(fixed_amounts[t] + rates[t] * v, v), where v
+    is the portfolio value after that year's returns.
+    
+    Parameters:
+    - gross_returns: Array of shape (n_years, n_assets) with annual gross asset returns (1 + r)
+    - alloc_vec: Array of target allocations, one per asset column
+    - initial_value: Portfolio value before the first year
+    - fixed_amounts: Array of fixed annual withdrawal amounts
+    - rates: Array of annual withdrawal rates applied to the post-return value
+    
+    Returns:
+    - values: Array of year-end portfolio values after withdrawals
+    - annual_returns: Array of annual portfolio returns (including withdrawals)
+    - withdrawals: Array of annual withdrawal amounts
+    """
+    n_years, n_assets = gross_returns.shape
+    values = np.empty(n_years)
+    annual_returns = np.empty(n_years)
+    withdrawals = np.empty(n_years)
+    value = initial_value
+    for t in range(n_years):
+        prev_value = value
+        growth = 0.0
+        for k in range(n_assets):
+            growth += alloc_vec[k] * gross_returns[t, k]
+        value = value * growth
+        withdrawal = min(fixed_amounts[t] + rates[t] * value, value)
+        if withdrawal > 0:
+            value -= withdrawal
+        withdrawals[t] = withdrawal
+        values[t] = value
+        annual_returns[t] = 0.0 if abs(prev_value) <= 1e-8 else value / prev_value - 1.0
+    return values, annual_returns, withdrawals
+
+
+# The groupby kernels are compiled lazily since pandas may hand them read-only
+# arrays, and skip fastmath, which would let numba drop their NaN checks
+@njit(cache=CACHE_KERNELS)
+def groupby_sum_count(codes, values, n_groups):
+    """
+    Sum and count the non-NaN values of each group.
+    
+    Parameters:
+    - codes: Array of group codes in [0, n_groups), negative for rows without a group
+    - values: Array of values, one per row
+    - n_groups: Number of groups
+    
+    Returns:
+    - sums: Array of per-group sums
+    - counts: Array of per-group counts of non-NaN values
+    """
+    sums = np.zeros(n_groups)
+    counts = np.zeros(n_groups, dtype=np.int64)
+    for i in range(codes.shape[0]):
+        code = codes[i]
+        value = values[i]
+        # NaN values and rows without a group are skipped, as in pandas
+        if code >= 0 and value == value:
+            sums[code] += value
+            counts[code] += 1
+    return sums, counts
+
+
+@njit(cache=CACHE_KERNELS)
+def groupby_mean(codes, values, n_groups):
+    """
+    Average the non-NaN values of each group.
+    
+    Parameters:
+    - codes: Array of group codes in [0, n_groups), negative for rows without a group
+    - values: Array of values, one per row
+    - n_groups: Number of groups
+    
+    Returns:
+    - means: Array of per-group means, NaN for groups without values
+    """
+    sums, counts = groupby_sum_count(codes, values, n_groups)
+    means = np.empty(n_groups)
+    for g in range(n_groups):
+        means[g] = sums[g] / counts[g] if counts[g] > 0 else np.nan
+    return means
+
+
+def warmup():
+    """
+    Run every kernel once on a tiny input.
+    
+    Loading the cached machine code happens at import, but the first call still
+    pays for dispatch setup; long-running callers such as the GUI can call this
+    up front so the first simulation starts at full speed.
+    """
+    values = np.ones(1)
+    withdrawal_path(values, np.zeros(1), 1.0)
+    simulate_with_strategy(np.ones((1, 1)), values, 1.0, np.zeros(1), np.zeros(1))
+    groupby_mean(np.zeros(1, dtype=np.intp), values, 1)
@@ -6,6 +6,31 @@ import logging
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# (modification time, DataFrame) of parsed CSV files, keyed by (path, read_csv options)
+_DF_CACHE = {}
+
+def load_csv_cached(filepath, **read_csv_kwargs):
+    """
+    Read a CSV file, reusing the parsed DataFrame while the file is unchanged.
+    
+    Long-running callers such as the GUI load the same files on every run; the cache
+    is keyed by the file's modification time so edited files are parsed again.
+    
+    Parameters:
+    - filepath: Path to the CSV file
+    - read_csv_kwargs: Options passed on to pd.read_csv
+    
+    Returns:
+    - DataFrame with the file's contents; a copy, so callers may modify it
+    """
+    key = (os.path.abspath(filepath), tuple(sorted(read_csv_kwargs.items())))
+    mtime = os.path.getmtime(filepath)
+    cached = _DF_CACHE.get(key)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, pd.read_csv(filepath, **read_csv_kwargs))
+        _DF_CACHE[key] = cached
+    return cached[1].copy()
+
 def load_sp500_data(filepath, start_year=None, end_year=None):
     """
     Load S&P 500 data and convert to annual returns
@@ -22,7 +47,7 @@ def load_sp500_data(filepath, start_year=None, end_year=None):
     
     try:
         # Load raw price data
-        df = pd.read_csv(filepath, index_col='Date', parse_dates=True)
+        df = load_csv_cached(filepath, index_col='Date', parse_dates=True)
         
         # Extract year from the index
         df['Year'] = df.index.year
@@ -70,7 +95,7 @@ def load_bond_returns(filepath, start_year=None, end_year=None):
     
     try:
         # Load bond return data
-        df = pd.read_csv(filepath, index_col='Date', parse_dates=True)
+        df = load_csv_cached(filepath, index_col='Date', parse_dates=True)
         
         # Extract year from the index
         df['Year'] = df.index.year
@@ -112,7 +137,7 @@ def load_structured_notes(filepath, filter_params=None):
     
     try:
         # Load note data
-        df = pd.read_csv(filepath)
+        df = load_csv_cached(filepath)
         
         # Apply filters if specified
         if filter_params:
@@ -185,16 +210,15 @@ def align_data(sp500_returns, bond_returns, notes_data, start_year, end_year):
     """
     logger.info(f"Aligning data from {start_year} to {end_year}")
     
-    # Find years with data in all sources
-    sp500_years = set(sp500_returns.keys())
-    bond_years = set(bond_returns.keys())
-    note_years = set(notes_data['year'].unique())
-    
-    # Find intersection of all years
-    valid_years = sorted(list(sp500_years.intersection(bond_years).intersection(note_years)))
+    # Find years with data in all sources, as a sorted year index
+    common = (pd.Index(list(sp500_returns.keys()))
+              .intersection(pd.Index(list(bond_returns.keys())))
+              .intersection(pd.Index(notes_data['year'].unique()))
+              .sort_values())
     
     # Filter to requested range
-    valid_years = [year for year in valid_years if start_year <= year <= end_year]
+    common = common[(common >= start_year) & (common <= end_year)]
+    valid_years = list(common)
     
     if not valid_years:
         logger.error(f"No overlapping data available for years {start_year} to {end_year}")
@@ -207,10 +231,35 @@ def align_data(sp500_returns, bond_returns, notes_data, start_year, end_year):
     aligned_bonds = {year: bond_returns[year] for year in valid_years}
     
     # Filter notes to valid years
-    aligned_notes = notes_data[notes_data['year'].isin(valid_years)]
+    aligned_notes = notes_data[notes_data['year'].isin(common)]
     
     return valid_years, aligned_sp500, aligned_bonds, aligned_notes
 
+def build_returns_matrix(sp500_returns, bond_returns, start_year, end_year):
+    """
+    Stack annual market returns into a contiguous (n_years, n_assets) array.
+    
+    Parameters:
+    - sp500_returns: Dict of S&P 500 annual returns
+    - bond_returns: Dict of bond annual returns
+    - start_year: First year in the simulation
+    - end_year: Last year in the simulation
+    
+    Returns:
+    - tuple: (returns_matrix, columns) where row t holds the returns for start_year + t
+      and columns maps asset names to column indexes; missing years are 0
+    """
+    years = range(start_year, end_year + 1)
+    sources = {'sp500': sp500_returns, 'bonds': bond_returns}
+    
+    returns_matrix = np.empty((len(years), len(sources)), dtype=np.float64)
+    for col, returns in enumerate(sources.values()):
+        returns_matrix[:, col] = np.fromiter((returns.get(year, 0) for year in years),
+                                             dtype=np.float64, count=len(years))
+    
+    columns = {asset: col for col, asset in enumerate(sources)}
+    return returns_matrix, columns
+
 def add_note_ids(notes_data):
     """
     Add a unique Note ID to each note based on its core parameters.
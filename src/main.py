@@ -1,26 +1,87 @@
 import os
+import atexit
+import queue
 import logging
 import argparse
+from logging.handlers import QueueHandler, QueueListener
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime
 
-from .data_processing import load_sp500_data, load_bond_returns, load_structured_notes, align_data
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    # pyarrow is optional; results are written with the pandas writer instead
+    pa = None
+
+from .data_processing import (load_sp500_data, load_bond_returns, load_structured_notes, align_data,
+                              build_returns_matrix)
 from .simulation import PortfolioSimulation
+from .portfolio import _refresh_debug_flag
+
+# Results with more rows than this are streamed to CSV instead of built as a DataFrame
+STREAM_RESULTS_THRESHOLD = 100_000
+
+# Size of the write buffer behind the log file
+LOG_BUFFER_SIZE = 64 * 1024
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    File handler that writes through a large buffer instead of flushing every record.
+    
+    Records at flush_level or above still flush the buffer, so errors reach the file
+    even if the process is killed or hangs afterwards.
+    """
+    
+    def __init__(self, filename, flush_level=logging.ERROR, **kwargs):
+        self.flush_level = flush_level
+        self._flush_pending = False
+        super().__init__(filename, **kwargs)
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_BUFFER_SIZE,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record):
+        # StreamHandler.emit calls flush() after every record; only severe ones go through
+        self._flush_pending = record.levelno >= self.flush_level
+        super().emit(record)
+    
+    def flush(self):
+        # Lower records are written out when the buffer fills up or the handler is closed
+        if self._flush_pending:
+            super().flush()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f"simulation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-def parse_arguments():
-    """Parse command line arguments."""
+def configure_logging(log_level='INFO'):
+    """
+    Configure logging: records are queued and written by a background listener.
+    
+    Parameters:
+    - log_level: Name of the root log level; a log file is only written at DEBUG
+    """
+    log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    log_stream_handler = logging.StreamHandler()
+    log_stream_handler.setFormatter(log_formatter)
+    handlers = [log_stream_handler]
+    
+    if log_level == 'DEBUG':
+        log_file_handler = BufferedFileHandler(f"simulation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+        log_file_handler.setFormatter(log_formatter)
+        handlers.append(log_file_handler)
+    
+    log_queue = queue.Queue(-1)
+    logging.getLogger().setLevel(getattr(logging, log_level))
+    logging.getLogger().addHandler(QueueHandler(log_queue))
+    log_listener = QueueListener(log_queue, *handlers)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    _refresh_debug_flag()
+
+
+def parse_arguments(argv=None):
+    """Parse command line arguments, or the given argument list."""
     parser = argparse.ArgumentParser(description='Portfolio Simulator')
     
     # Data input files
@@ -69,8 +130,10 @@ def parse_arguments():
                         help='Directory to save results')
     parser.add_argument('--plot', action='store_true',
                         help='Generate and save plots')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING'],
+                        help='Logging level; a log file is only written at DEBUG')
     
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 def setup_portfolios(args):
     """Set up portfolio allocations based on command line arguments."""
@@ -104,6 +167,14 @@ def setup_withdrawal_params(args):
     
     return params
 
+def write_results_csv(results_df, path):
+    """Write the detailed results table to CSV, using pyarrow's writer when available."""
+    if pa is not None:
+        pa_csv.write_csv(pa.Table.from_pandas(results_df, preserve_index=False), path)
+    else:
+        # Write in chunks to bound the memory used for text conversion
+        results_df.to_csv(path, index=False, chunksize=100_000)
+
 def save_results(simulation, args):
     """Save simulation results to files."""
     # Create output directory if it doesn't exist
@@ -113,9 +184,13 @@ def save_results(simulation, args):
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
     # Save detailed results to CSV
-    results_df = simulation.get_results_dataframe()
     results_path = os.path.join(args.output_dir, f'simulation_results_{timestamp}.csv')
-    results_df.to_csv(results_path, index=False)
+    if simulation.get_result_row_count() > STREAM_RESULTS_THRESHOLD:
+        results_df = None
+        simulation.stream_results(results_path)
+    else:
+        results_df = simulation.get_results_dataframe()
+        write_results_csv(results_df, results_path)
     logger.info(f"Saved detailed results to {results_path}")
     
     # Save summary statistics to CSV
@@ -127,25 +202,60 @@ def save_results(simulation, args):
     
     # Generate plots if requested
     if args.plot:
+        if results_df is None:
+            results_df = simulation.get_results_dataframe()
         plot_results(results_df, args.output_dir, timestamp)
 
-def plot_results(results_df, output_dir, timestamp):
-    """Generate and save plots of simulation results."""
-    # Define a vibrant, modern color palette
-    colors = {
-        'traditional': '#FF6B6B',  # Vibrant coral red
-        'structured': '#4ECDC4',   # Bright teal
-        'background': '#F7FFF7',   # Light mint background
-        'grid': '#CFD8DC',         # Soft blue-gray
-        'text': '#2E3D49',         # Dark blue-gray text
-        'title': '#2D3142'         # Deep navy for titles
-    }
+def _style_axes(ax, colors, title, ylabel):
+    """Apply the shared title, label, grid, spine and legend styling to an axes."""
+    ax.set_title(title, fontsize=24, fontweight='bold', color=colors['title'], pad=20)
+    ax.set_xlabel('Year', fontsize=20, fontweight='bold', color=colors['title'], labelpad=15)
+    ax.set_ylabel(ylabel, fontsize=20, fontweight='bold', color=colors['title'], labelpad=15)
     
-    # Set plotting style for more attractive charts
-    plt.style.use('ggplot')
+    # Add grid for readability but make it subtle
+    ax.grid(True, linestyle='--', alpha=0.3, linewidth=0.8)
     
-    # Set larger font sizes globally
-    plt.rcParams.update({
+    # Add a subtle shadow effect to the plot area
+    for spine in ax.spines.values():
+        spine.set_visible(True)
+        spine.set_color(colors['grid'])
+        spine.set_linewidth(1.5)
+    
+    # Enhanced legend with shadow and rounded corners
+    ax.legend(fontsize=18, loc='upper left', facecolor=colors['background'], 
+              framealpha=0.9, edgecolor=colors['grid'], fancybox=True, shadow=True)
+
+# Define a vibrant, modern color palette
+PLOT_COLORS = {
+    'traditional': '#FF6B6B',  # Vibrant coral red
+    'structured': '#4ECDC4',   # Bright teal
+    'background': '#F7FFF7',   # Light mint background
+    'grid': '#CFD8DC',         # Soft blue-gray
+    'text': '#2E3D49',         # Dark blue-gray text
+    'title': '#2D3142'         # Deep navy for titles
+}
+
+# Longer series are drawn without markers and with a single rasterized fill
+MARKER_MAX_POINTS = 40
+
+# ggplot style with larger font sizes, built once by _configure_plot_style
+_PLOT_STYLE = None
+_STYLE_CONFIGURED = False
+
+def _configure_plot_style():
+    """Select the Agg backend and build the plot style; runs once per process."""
+    global _PLOT_STYLE, _STYLE_CONFIGURED
+    if _STYLE_CONFIGURED:
+        return
+    
+    # Imported here so runs without --plot skip matplotlib's startup cost
+    import matplotlib
+    matplotlib.use('Agg')  # Plots are only saved to disk, no GUI backend needed
+    import matplotlib.style
+    
+    colors = PLOT_COLORS
+    _PLOT_STYLE = dict(matplotlib.style.library['ggplot'])
+    _PLOT_STYLE.update({
         'font.size': 14,
         'axes.titlesize': 24,       # Larger title
         'axes.labelsize': 20,       # Larger axis labels
@@ -163,184 +273,186 @@ def plot_results(results_df, output_dir, timestamp):
         'grid.alpha': 0.3,
         'grid.color': colors['grid'],
     })
+    _STYLE_CONFIGURED = True
+
+def plot_results(results_df, output_dir, timestamp):
+    """Generate and save plots of simulation results."""
+    _configure_plot_style()
+    import matplotlib.pyplot as plt
     
-    # Create a figure for portfolio values - increased by 30%
-    plt.figure(figsize=(16, 10))
-    
-    # Get unique portfolios
-    portfolios = results_df['portfolio'].unique()
+    # Apply the style only while drawing so global matplotlib state is untouched
+    with plt.style.context(_PLOT_STYLE):
+        _draw_plots(plt, results_df, output_dir, timestamp)
+
+def _draw_plots(plt, results_df, output_dir, timestamp):
+    """Draw and save the portfolio value and annual return plots."""
+    from matplotlib.ticker import FuncFormatter
     
-    # Plot portfolio values over time with vibrant colors
-    for i, portfolio in enumerate(portfolios):
-        portfolio_data = results_df[results_df['portfolio'] == portfolio]
-        color = colors['traditional'] if portfolio == 'traditional' else colors['structured']
-        plt.plot(portfolio_data['year'], portfolio_data['portfolio_value'], 
-                 label=portfolio.capitalize(), 
-                 linewidth=4,  # Thicker lines
-                 color=color,
-                 marker='o',   # Add markers
-                 markersize=8, # Larger markers
-                 alpha=0.9)    # Slight transparency
-    
-    plt.title('Portfolio Values Over Time', fontsize=24, fontweight='bold', color=colors['title'], pad=20)
-    plt.xlabel('Year', fontsize=20, fontweight='bold', color=colors['title'], labelpad=15)
-    plt.ylabel('Portfolio Value ($)', fontsize=20, fontweight='bold', color=colors['title'], labelpad=15)
+    colors = PLOT_COLORS
     
-    # Add grid for readability but make it subtle
-    plt.grid(True, linestyle='--', alpha=0.3, linewidth=0.8)
+    # Sort once so each portfolio's rows are contiguous and in year order
+    results_df = results_df.sort_values(['portfolio', 'year'])
+    grouped = results_df.groupby('portfolio', sort=False)
     
-    # Add a subtle shadow effect to the plot area
-    ax = plt.gca()
-    for spine in ax.spines.values():
-        spine.set_visible(True)
-        spine.set_color(colors['grid'])
-        spine.set_linewidth(1.5)
+    # Create a figure for portfolio values - increased by 30%
+    fig, ax = plt.subplots(figsize=(16, 10))
     
-    # Enhanced legend with shadow and rounded corners
-    legend = plt.legend(fontsize=18, loc='upper left', facecolor=colors['background'], 
-                     framealpha=0.9, edgecolor=colors['grid'], fancybox=True, shadow=True)
+    # Plot portfolio values over time with vibrant colors
+    for portfolio, portfolio_data in grouped:
+        color = colors.get(portfolio, colors['structured'])
+        marker_style = {'marker': 'o', 'markersize': 8} if len(portfolio_data) <= MARKER_MAX_POINTS else {}
+        ax.plot(portfolio_data['year'], portfolio_data['portfolio_value'], 
+                label=portfolio.capitalize(), 
+                linewidth=4,  # Thicker lines
+                color=color,
+                alpha=0.9,    # Slight transparency
+                **marker_style)
+    
+    _style_axes(ax, colors, 'Portfolio Values Over Time', 'Portfolio Value ($)')
     
     # Add y-axis formatter for dollar values
-    plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, pos: '${:,.0f}'.format(x)))
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, pos: '${:,.0f}'.format(x)))
     
     # Add a subtle fill between the x-axis and the line for better visual effect
-    for i, portfolio in enumerate(portfolios):
-        portfolio_data = results_df[results_df['portfolio'] == portfolio]
-        color = colors['traditional'] if portfolio == 'traditional' else colors['structured']
-        plt.fill_between(portfolio_data['year'], 
-                       0, 
-                       portfolio_data['portfolio_value'], 
-                       alpha=0.1, 
-                       color=color)
-    
-    # Save figure with high resolution
-    plt.tight_layout()
+    for portfolio, portfolio_data in grouped:
+        color = colors.get(portfolio, colors['structured'])
+        ax.fill_between(portfolio_data['year'], 
+                        0, 
+                        portfolio_data['portfolio_value'], 
+                        alpha=0.1, 
+                        color=color,
+                        rasterized=len(portfolio_data) > MARKER_MAX_POINTS)
+    
+    # Save figure; 150 dpi is plenty for on-screen display
+    fig.tight_layout()
     plot_path = os.path.join(output_dir, f'portfolio_values_{timestamp}.png')
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(plot_path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
     logger.info(f"Saved portfolio values plot to {plot_path}")
     
     # Create a figure for annual returns - increased by 30%
-    plt.figure(figsize=(16, 10))
+    fig, ax = plt.subplots(figsize=(16, 10))
     
     # Plot annual returns over time with vibrant colors
-    for i, portfolio in enumerate(portfolios):
-        portfolio_data = results_df[results_df['portfolio'] == portfolio]
-        color = colors['traditional'] if portfolio == 'traditional' else colors['structured']
-        plt.plot(portfolio_data['year'], portfolio_data['annual_return'], 
-                 label=portfolio.capitalize(), 
-                 linewidth=4,  # Thicker lines
-                 color=color,
-                 marker='o',   # Add markers
-                 markersize=8, # Larger markers
-                 alpha=0.9)    # Slight transparency
-    
-    plt.title('Annual Portfolio Returns', fontsize=24, fontweight='bold', color=colors['title'], pad=20)
-    plt.xlabel('Year', fontsize=20, fontweight='bold', color=colors['title'], labelpad=15)
-    plt.ylabel('Annual Return (%)', fontsize=20, fontweight='bold', color=colors['title'], labelpad=15)
-    
-    # Add grid for readability but make it subtle
-    plt.grid(True, linestyle='--', alpha=0.3, linewidth=0.8)
-    
-    # Add a subtle shadow effect to the plot area
-    ax = plt.gca()
-    for spine in ax.spines.values():
-        spine.set_visible(True)
-        spine.set_color(colors['grid'])
-        spine.set_linewidth(1.5)
-    
-    # Enhanced legend with shadow and rounded corners
-    legend = plt.legend(fontsize=18, loc='upper left', facecolor=colors['background'], 
-                     framealpha=0.9, edgecolor=colors['grid'], fancybox=True, shadow=True)
+    for portfolio, portfolio_data in grouped:
+        color = colors.get(portfolio, colors['structured'])
+        marker_style = {'marker': 'o', 'markersize': 8} if len(portfolio_data) <= MARKER_MAX_POINTS else {}
+        ax.plot(portfolio_data['year'], portfolio_data['annual_return'], 
+                label=portfolio.capitalize(), 
+                linewidth=4,  # Thicker lines
+                color=color,
+                alpha=0.9,    # Slight transparency
+                **marker_style)
+    
+    _style_axes(ax, colors, 'Annual Portfolio Returns', 'Annual Return (%)')
     
     # Add y-axis formatter for percentage values
-    plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, pos: '{:.1f}%'.format(x * 100)))
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, pos: '{:.1f}%'.format(x * 100)))
     
     # Add reference line at y=0
-    plt.axhline(y=0, color=colors['grid'], linestyle='-', linewidth=1.5, alpha=0.7)
+    ax.axhline(y=0, color=colors['grid'], linestyle='-', linewidth=1.5, alpha=0.7)
     
     # Add a subtle fill between 0 and the line for better visual effect
     # Use different fill for positive and negative values
-    for i, portfolio in enumerate(portfolios):
-        portfolio_data = results_df[results_df['portfolio'] == portfolio]
+    for portfolio, portfolio_data in grouped:
         years = portfolio_data['year']
         returns = portfolio_data['annual_return']
-        color = colors['traditional'] if portfolio == 'traditional' else colors['structured']
+        color = colors.get(portfolio, colors['structured'])
+        
+        # Long series get one rasterized fill instead of the two-pass fill
+        if len(portfolio_data) > MARKER_MAX_POINTS:
+            ax.fill_between(years, 0, returns, alpha=0.15, color=color, rasterized=True)
+            continue
         
         # Fill positive returns
-        plt.fill_between(years, 0, returns, 
-                       where=(returns >= 0),
-                       alpha=0.15, 
-                       color=color)
+        ax.fill_between(years, 0, returns, 
+                        where=(returns >= 0),
+                        alpha=0.15, 
+                        color=color)
         
         # Fill negative returns with a darker shade
-        plt.fill_between(years, 0, returns, 
-                       where=(returns < 0),
-                       alpha=0.15, 
-                       color=color)
+        ax.fill_between(years, 0, returns, 
+                        where=(returns < 0),
+                        alpha=0.15, 
+                        color=color)
     
-    # Save figure with high resolution
-    plt.tight_layout()
+    # Save figure; 150 dpi is plenty for on-screen display
+    fig.tight_layout()
     plot_path = os.path.join(output_dir, f'annual_returns_{timestamp}.png')
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(plot_path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
     logger.info(f"Saved annual returns plot to {plot_path}")
 
+def run_simulation(args):
+    """
+    Load the data, run the simulation and save its results.
+    
+    Errors are raised to the caller, so this can be called in-process (e.g. by the GUI).
+    
+    Parameters:
+    - args: Namespace of simulation options, as returned by parse_arguments
+    """
+    logger.info("Starting Portfolio Simulator")
+    logger.info(f"Simulation period: {args.start_year} to {args.end_year}")
+    
+    # Load data
+    logger.info("Loading market data and structured notes...")
+    sp500_returns = load_sp500_data(args.sp500_file)
+    bond_returns = load_bond_returns(args.bond_file)
+    notes_data = load_structured_notes(args.notes_file)
+    
+    # Align data to ensure consistent years
+    valid_years, aligned_sp500, aligned_bonds, aligned_notes = align_data(
+        sp500_returns, bond_returns, notes_data, 
+        args.start_year, args.end_year
+    )
+    
+    start_year = max(args.start_year, min(valid_years))
+    end_year = min(args.end_year, max(valid_years))
+    
+    if start_year != args.start_year or end_year != args.end_year:
+        logger.warning(f"Adjusted simulation period to {start_year}-{end_year} based on available data")
+    
+    # Stack market returns once into a contiguous matrix for the simulation
+    market_returns = build_returns_matrix(aligned_sp500, aligned_bonds, start_year, end_year)
+    
+    # Set up portfolio allocations
+    portfolio_allocations = setup_portfolios(args)
+    
+    # Set up withdrawal parameters
+    withdrawal_params = setup_withdrawal_params(args)
+    
+    # Set up note selection parameters
+    note_selection_params = {
+        'protection_level': args.protection_level
+    }
+    
+    # Create and run simulation
+    logger.info("Running portfolio simulation...")
+    simulation = PortfolioSimulation(
+        aligned_sp500, aligned_bonds, aligned_notes,
+        start_year, end_year, args.initial_value,
+        portfolio_allocations,
+        note_selection_params=note_selection_params,
+        withdrawal_params=withdrawal_params,
+        market_returns=market_returns
+    )
+    
+    simulation.run_simulation()
+    
+    # Save results
+    save_results(simulation, args)
+    
+    logger.info("Simulation completed successfully")
+
 def main():
     """Main entry point for portfolio simulation."""
     # Parse command line arguments
     args = parse_arguments()
-    
-    logger.info("Starting Portfolio Simulator")
-    logger.info(f"Simulation period: {args.start_year} to {args.end_year}")
+    configure_logging(args.log_level)
     
     try:
-        # Load data
-        logger.info("Loading market data and structured notes...")
-        sp500_returns = load_sp500_data(args.sp500_file)
-        bond_returns = load_bond_returns(args.bond_file)
-        notes_data = load_structured_notes(args.notes_file)
-        
-        # Align data to ensure consistent years
-        valid_years, aligned_sp500, aligned_bonds, aligned_notes = align_data(
-            sp500_returns, bond_returns, notes_data, 
-            args.start_year, args.end_year
-        )
-        
-        start_year = max(args.start_year, min(valid_years))
-        end_year = min(args.end_year, max(valid_years))
-        
-        if start_year != args.start_year or end_year != args.end_year:
-            logger.warning(f"Adjusted simulation period to {start_year}-{end_year} based on available data")
-        
-        # Set up portfolio allocations
-        portfolio_allocations = setup_portfolios(args)
-        
-        # Set up withdrawal parameters
-        withdrawal_params = setup_withdrawal_params(args)
-        
-        # Set up note selection parameters
-        note_selection_params = {
-            'protection_level': args.protection_level
-        }
-        
-        # Create and run simulation
-        logger.info("Running portfolio simulation...")
-        simulation = PortfolioSimulation(
-            aligned_sp500, aligned_bonds, aligned_notes,
-            start_year, end_year, args.initial_value,
-            portfolio_allocations,
-            note_selection_params=note_selection_params,
-            withdrawal_params=withdrawal_params
-        )
-        
-        simulation.run_simulation()
-        
-        # Save results
-        save_results(simulation, args)
-        
-        logger.info("Simulation completed successfully")
-        
+        run_simulation(args)
     except Exception as e:
         logger.error(f"Error during simulation: {str(e)}", exc_info=True)
         return 1
@@ -349,4 +461,4 @@ def main():
 
 if __name__ == "__main__":
     exit_code = main()
-    exit(exit_code) 
\ No newline at end of file
+    exit(exit_code)
\ No newline at end of file
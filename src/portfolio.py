@@ -1,19 +1,32 @@
 import logging
 import numpy as np
 
+from ._kernels import withdrawal_path
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Cached DEBUG check for the per-year hot paths; the log level does not change
+# mid-simulation, so callers refresh it once after configuring logging
+_DEBUG_ENABLED = logger.isEnabledFor(logging.DEBUG)
+
+def _refresh_debug_flag():
+    """Re-read whether DEBUG logging is enabled for this module."""
+    global _DEBUG_ENABLED
+    _DEBUG_ENABLED = logger.isEnabledFor(logging.DEBUG)
+
 class Portfolio:
     """Represents a portfolio with different asset allocations."""
     
-    def __init__(self, initial_value, allocations):
+    def __init__(self, initial_value, allocations, return_columns=None):
         """
         Initialize portfolio with starting value and allocations.
         
         Parameters:
         - initial_value: Starting portfolio value
         - allocations: Dict of asset allocations (e.g., {"sp500": 0.6, "bonds": 0.4})
+        - return_columns: Optional dict mapping asset names to their column in the
+          return rows passed to apply_returns_vec
         """
         self.initial_value = initial_value
         self.allocations = allocations
@@ -23,8 +36,16 @@ class Portfolio:
         # Validate allocations
         self._validate_allocations()
         
+        # Freeze asset order so per-year updates work on flat arrays
+        self._asset_names = tuple(self.allocations)
+        self._alloc_vec = np.fromiter((self.allocations[a] for a in self._asset_names),
+                                      dtype=np.float64, count=len(self._asset_names))
+        self._asset_values = np.empty_like(self._alloc_vec)
+        self._ret_idx = None
+        if return_columns is not None:
+            self._ret_idx = np.array([return_columns[a] for a in self._asset_names], dtype=np.intp)
+        
         # Initialize asset values based on allocations
-        self.asset_values = {}
         self.rebalance()
         
         logger.info(f"Created portfolio with initial value ${initial_value:,.2f}")
@@ -33,7 +54,7 @@ class Portfolio:
     def _validate_allocations(self):
         """Validate that allocations sum to approximately 1.0."""
         total = sum(self.allocations.values())
-        if not np.isclose(total, 1.0, atol=1e-6):
+        if abs(total - 1.0) > 1e-6:
             logger.warning(f"Allocations do not sum to 1.0: {total:.4f}")
             # Normalize allocations
             for asset in self.allocations:
@@ -42,12 +63,12 @@ class Portfolio:
     
     def rebalance(self):
         """Rebalance portfolio to target allocations."""
-        logger.debug(f"Rebalancing portfolio (value: ${self.current_value:,.2f})")
+        self._asset_values[:] = self.current_value * self._alloc_vec
         
-        self.asset_values = {}
-        for asset, allocation in self.allocations.items():
-            self.asset_values[asset] = self.current_value * allocation
-            logger.debug(f"  {asset}: ${self.asset_values[asset]:,.2f} ({allocation:.2%})")
+        if _DEBUG_ENABLED:
+            logger.debug(f"Rebalancing portfolio (value: ${self.current_value:,.2f})")
+            for asset, value, allocation in zip(self._asset_names, self._asset_values, self._alloc_vec):
+                logger.debug(f"  {asset}: ${value:,.2f} ({allocation:.2%})")
     
     def apply_returns(self, returns_dict):
         """
@@ -59,27 +80,75 @@ class Portfolio:
         Returns:
         - new_value: Updated portfolio value after applying returns
         """
-        logger.debug(f"Applying returns to portfolio (value: ${self.current_value:,.2f})")
+        debug = _DEBUG_ENABLED
+        if debug:
+            logger.debug(f"Applying returns to portfolio (value: ${self.current_value:,.2f})")
         
         # Store previous value for return calculation
         self.prev_value = self.current_value
         
-        # Apply returns to each asset
-        for asset, value in self.asset_values.items():
+        # Gather returns in asset order; assets without data are left unchanged
+        returns_vec = np.zeros_like(self._alloc_vec)
+        for i, asset in enumerate(self._asset_names):
             if asset in returns_dict:
-                ret = returns_dict[asset]
-                new_value = value * (1 + ret)
-                logger.debug(f"  {asset}: ${value:,.2f} -> ${new_value:,.2f} (return: {ret:.2%})")
-                self.asset_values[asset] = new_value
+                returns_vec[i] = returns_dict[asset]
             else:
                 logger.warning(f"No return data for asset: {asset}")
         
+        if debug:
+            old_values = self._asset_values.copy()
+        self._asset_values *= 1 + returns_vec
+        
         # Update current value
-        self.current_value = sum(self.asset_values.values())
-        logger.debug(f"New portfolio value: ${self.current_value:,.2f}")
+        self.current_value = float(self._asset_values.sum())
+        
+        if debug:
+            for asset, value, new_value, ret in zip(self._asset_names, old_values, self._asset_values, returns_vec):
+                logger.debug(f"  {asset}: ${value:,.2f} -> ${new_value:,.2f} (return: {ret:.2%})")
+            logger.debug(f"New portfolio value: ${self.current_value:,.2f}")
         
         return self.current_value
     
+    def apply_returns_vec(self, returns_row):
+        """
+        Apply annual returns given as one row of a returns matrix.
+        
+        Parameters:
+        - returns_row: Array of returns indexed by the return_columns given at creation
+        
+        Returns:
+        - new_value: Updated portfolio value after applying returns
+        """
+        self.prev_value = self.current_value
+        self._asset_values *= 1.0 + returns_row[self._ret_idx]
+        self.current_value = float(self._asset_values.sum())
+        return self.current_value
+    
+    def simulate_path(self, returns_matrix, withdrawals=None):
+        """
+        Simulate the portfolio over several years with annual rebalancing.
+        
+        The portfolio itself is not modified; the path starts from its current value.
+        
+        Parameters:
+        - returns_matrix: Array of shape (n_years, n_assets) with annual returns,
+          columns in the same order as the allocations dict
+        - withdrawals: Optional array of annual withdrawal amounts
+        
+        Returns:
+        - values: Array of year-end portfolio values
+        """
+        returns_matrix = np.asarray(returns_matrix, dtype=np.float64)
+        
+        # With annual rebalancing each year's growth is a single weighted factor
+        portfolio_factors = 1.0 + returns_matrix @ self._alloc_vec
+        
+        if withdrawals is None:
+            return np.cumprod(portfolio_factors) * self.current_value
+        
+        withdrawals = np.asarray(withdrawals, dtype=np.float64)
+        return withdrawal_path(portfolio_factors, withdrawals, float(self.current_value))
+    
     def withdraw(self, amount):
         """
         Withdraw a specified amount from the portfolio, proportionally from all assets.
@@ -102,14 +171,18 @@ class Portfolio:
         # Withdraw proportionally from each asset
         withdrawal_ratio = actual_withdrawal / self.current_value
         
-        for asset in self.asset_values:
-            asset_withdrawal = self.asset_values[asset] * withdrawal_ratio
-            self.asset_values[asset] -= asset_withdrawal
-            logger.debug(f"  Withdrew ${asset_withdrawal:,.2f} from {asset}")
+        debug = _DEBUG_ENABLED
+        if debug:
+            for asset, value in zip(self._asset_names, self._asset_values):
+                logger.debug(f"  Withdrew ${value * withdrawal_ratio:,.2f} from {asset}")
+        
+        self._asset_values *= 1.0 - withdrawal_ratio
         
         # Update current value
         self.current_value -= actual_withdrawal
-        logger.debug(f"After withdrawal: ${self.current_value:,.2f}")
+        
+        if debug:
+            logger.debug(f"After withdrawal: ${self.current_value:,.2f}")
         
         return actual_withdrawal
     
@@ -119,18 +192,18 @@ class Portfolio:
     
     def get_annual_return(self):
         """Calculate annual return of the portfolio."""
-        if np.isclose(self.prev_value, 0):
+        if abs(self.prev_value) <= 1e-8:
             return 0
         
         return (self.current_value / self.prev_value) - 1
     
     def get_asset_values(self):
         """Return a dictionary of asset values."""
-        return self.asset_values.copy()
+        return dict(zip(self._asset_names, self._asset_values.tolist()))
     
     def get_asset_allocations(self):
         """Return a dictionary of current asset allocations (as percentages)."""
-        if np.isclose(self.current_value, 0):
-            return {asset: 0 for asset in self.asset_values}
+        if abs(self.current_value) <= 1e-8:
+            return {asset: 0 for asset in self._asset_names}
         
-        return {asset: value / self.current_value for asset, value in self.asset_values.items()} 
\ No newline at end of file
+        return dict(zip(self._asset_names, (self._asset_values / self.current_value).tolist())) 
\ No newline at end of file
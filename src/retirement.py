@@ -30,6 +30,29 @@ class WithdrawalStrategy:
         - withdrawal_amount: Amount to withdraw
         """
         raise NotImplementedError("Subclasses must implement this method")
+    
+    def withdrawal_schedule(self, years, first_year_value):
+        """
+        Express the strategy as per-year fixed amounts and rates of portfolio value.
+        
+        The withdrawal in year t is min(fixed_amounts[t] + rates[t] * value, value),
+        where value is the portfolio value after that year's returns. Strategies
+        that cannot be written this way return None and are evaluated year by year.
+        
+        Parameters:
+        - years: Array of simulated years
+        - first_year_value: Value of the first portfolio after the first year's returns
+        
+        Returns:
+        - schedule: Tuple (fixed_amounts, rates) of arrays, or None
+        """
+        return None
+    
+    def _years_since_start(self, years):
+        """Return the number of years since start_year for each simulated year."""
+        if self.start_year is None:
+            return np.zeros(len(years))
+        return np.asarray(years, dtype=np.float64) - self.start_year
 
 
 class FixedPercentageWithdrawal(WithdrawalStrategy):
@@ -81,6 +104,18 @@ class FixedPercentageWithdrawal(WithdrawalStrategy):
         
         # Can't withdraw more than what's available
         return min(withdrawal, portfolio_value)
+    
+    def withdrawal_schedule(self, years, first_year_value):
+        """Fixed amounts for inflation-adjusted withdrawals, otherwise a fixed rate."""
+        # The initial value is shared by all portfolios, as in calculate_withdrawal
+        if self.initial_portfolio_value is None:
+            self.initial_portfolio_value = first_year_value
+        
+        if self.inflation_adjusted:
+            inflation_factors = (1 + self.inflation_rate) ** self._years_since_start(years)
+            return self.initial_portfolio_value * self.rate * inflation_factors, np.zeros(len(years))
+        
+        return np.zeros(len(years)), np.full(len(years), self.rate)
 
 
 class FixedDollarWithdrawal(WithdrawalStrategy):
@@ -124,6 +159,14 @@ class FixedDollarWithdrawal(WithdrawalStrategy):
         
         # Can't withdraw more than what's available
         return min(withdrawal, portfolio_value)
+    
+    def withdrawal_schedule(self, years, first_year_value):
+        """Fixed amounts, adjusted for inflation if requested."""
+        if self.inflation_adjusted:
+            amounts = self.amount * (1 + self.inflation_rate) ** self._years_since_start(years)
+        else:
+            amounts = np.full(len(years), float(self.amount))
+        return amounts, np.zeros(len(years))
 
 
 class RMDWithdrawal(WithdrawalStrategy):
@@ -183,6 +226,20 @@ class RMDWithdrawal(WithdrawalStrategy):
         logger.debug(f"Year {current_year} (Age {self.current_age}): RMD calculation: ${portfolio_value:,.2f} / {divisor:.1f} = ${withdrawal:,.2f}")
         
         return withdrawal
+    
+    def withdrawal_schedule(self, years, first_year_value):
+        """Rates of 1 / divisor for each year's age, zero before RMDs apply."""
+        if self.start_year is not None and len(years):
+            ages = self.starting_age + (np.asarray(years) - self.start_year)
+            self.current_age = int(ages[-1])
+        else:
+            ages = np.full(len(years), self.current_age)
+        
+        rates = np.zeros(len(years))
+        for t, age in enumerate(ages.tolist()):
+            if age >= self.starting_age:
+                rates[t] = 1.0 / self.rmd_factors.get(min(age, 100), 6.4)
+        return np.zeros(len(years)), rates
 
 
 def create_withdrawal_strategy(params):
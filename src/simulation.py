@@ -1,20 +1,64 @@
+import csv
 import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from .portfolio import Portfolio
-from .structured_notes import create_note
+from .structured_notes import vectorized_note_payoff
 from .retirement import create_withdrawal_strategy
+from .data_processing import build_returns_matrix
+from ._kernels import simulate_with_strategy
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+class _NotesTable:
+    """Columns of the structured notes data used for note selection, as typed arrays."""
+    
+    def __init__(self, notes_data):
+        """
+        Materialize the selection columns of a notes DataFrame.
+        
+        Parameters:
+        - notes_data: DataFrame of structured notes data
+        """
+        n_rows = len(notes_data)
+        self.years = notes_data['year'].to_numpy(dtype=np.int32)
+        self.protection_level = notes_data['protection_level'].to_numpy(dtype=np.float64)
+        self.participation_rate = notes_data['participation_rate'].to_numpy(dtype=np.float64)
+        if 'protection_type' in notes_data:
+            self.protection_type = notes_data['protection_type'].to_numpy(dtype=object)
+        else:
+            self.protection_type = np.full(n_rows, 'Buffer', dtype=object)
+    
+    def rows_by_year(self):
+        """Return a dict mapping each year to the positions of its rows, in table order."""
+        order = np.argsort(self.years, kind='stable')
+        years, starts = np.unique(self.years[order], return_index=True)
+        return dict(zip(years.tolist(), np.split(order, starts[1:])))
+    
+    def closest_row(self, rows, target_protection):
+        """
+        Return the first of the given rows whose protection level is closest to the target.
+        
+        Parameters:
+        - rows: Array of row positions to choose from
+        - target_protection: Target protection level
+        
+        Returns:
+        - row: Position of the selected row (an exact match if one exists)
+        """
+        distances = np.abs(self.protection_level[rows] - target_protection)
+        if np.isnan(distances).all():
+            return int(rows[0])
+        return int(rows[np.nanargmin(distances)])
+
 class PortfolioSimulation:
     """Simulates portfolio performance over time with optional withdrawals."""
     
     def __init__(self, sp500_returns, bond_returns, notes_data, start_year, end_year, 
                  initial_value, portfolio_allocations, note_selection_params=None,
-                 withdrawal_params=None, pre_selected_notes=None):
+                 withdrawal_params=None, pre_selected_notes=None, market_returns=None):
         """
         Initialize simulation with required data and parameters.
         
@@ -31,9 +75,9 @@ class PortfolioSimulation:
         - note_selection_params: Dict of parameters for selecting structured notes
         - withdrawal_params: Dict of withdrawal strategy parameters
         - pre_selected_notes: Dict mapping years to note parameters (optional)
+        - market_returns: Tuple of (returns_matrix, columns) from build_returns_matrix
+          (optional, built from sp500_returns and bond_returns when omitted)
         """
-        self.sp500_returns = sp500_returns
-        self.bond_returns = bond_returns
         self.notes_data = notes_data
         self.start_year = start_year
         self.end_year = end_year
@@ -43,10 +87,32 @@ class PortfolioSimulation:
         self.withdrawal_params = withdrawal_params
         self.pre_selected_notes = pre_selected_notes
         
+        # Notes are only selected and priced when some portfolio holds them
+        self._needs_notes = any('notes' in alloc for alloc in portfolio_allocations.values())
+        
+        # Market returns as a contiguous matrix with one row per simulated year
+        if market_returns is None:
+            market_returns = build_returns_matrix(sp500_returns, bond_returns, start_year, end_year)
+        self._returns_matrix, self._return_columns = market_returns
+        self._sp500_arr = self._returns_matrix[:, self._return_columns['sp500']]
+        self._bond_arr = self._returns_matrix[:, self._return_columns['bonds']]
+        self._asset_columns = self._build_asset_columns()
+        
+        # Note rows grouped by year, with each year's note selected up front
+        self._notes_table = None
+        self._note_rows_by_year = {}
+        self._selected_note_by_year = {}
+        self._index_notes()
+        
         # Dictionaries to store simulation results
         self.portfolios = {}
         self.results = {}
         
+        # Columnar result arrays per portfolio, filled by run_simulation
+        self._years = np.arange(start_year, end_year + 1, dtype=np.int32)
+        self._cols = {}
+        self._asset_values = {}
+        
         # Initialize portfolios
         self._initialize_portfolios()
         
@@ -57,13 +123,44 @@ class PortfolioSimulation:
         
         logger.info(f"Initialized simulation: {start_year} to {end_year}")
     
+    @property
+    def sp500_returns(self):
+        """Dict mapping simulated years to S&P 500 returns."""
+        return dict(zip(self._years.tolist(), self._sp500_arr.tolist()))
+    
+    @property
+    def bond_returns(self):
+        """Dict mapping simulated years to bond returns."""
+        return dict(zip(self._years.tolist(), self._bond_arr.tolist()))
+    
     def _initialize_portfolios(self):
         """Initialize portfolio objects for each allocation strategy."""
         for name, allocations in self.portfolio_allocations.items():
-            self.portfolios[name] = Portfolio(self.initial_value, allocations)
+            self.portfolios[name] = Portfolio(self.initial_value, allocations, self._asset_columns)
             self.results[name] = []
             logger.info(f"Created portfolio '{name}' with allocations: {allocations}")
     
+    def _build_asset_columns(self):
+        """
+        Map every asset held by a portfolio to a column of the per-year return rows.
+        
+        Market assets keep their returns matrix columns, structured notes follow them
+        when any portfolio holds notes, and assets without return data get a column
+        that always holds 0.
+        
+        Returns:
+        - asset_columns: Dict mapping asset names to column indices
+        """
+        asset_columns = dict(self._return_columns)
+        if self._needs_notes:
+            asset_columns.setdefault('notes', len(asset_columns))
+        for allocations in self.portfolio_allocations.values():
+            for asset in allocations:
+                if asset not in asset_columns:
+                    logger.warning(f"No return data for asset: {asset}")
+                    asset_columns[asset] = len(asset_columns)
+        return asset_columns
+    
     def _initialize_withdrawal_strategy(self):
         """Initialize the withdrawal strategy based on parameters."""
         if self.withdrawal_params:
@@ -74,6 +171,33 @@ class PortfolioSimulation:
             self.withdrawal_strategy = create_withdrawal_strategy(self.withdrawal_params)
             logger.info(f"Created withdrawal strategy: {self.withdrawal_strategy.__class__.__name__}")
     
+    def _index_notes(self):
+        """Group the note rows by year and select each year's note for the selection params."""
+        if self.notes_data is None or self.notes_data.empty or not self._needs_notes:
+            return
+        
+        self._notes_table = _NotesTable(self.notes_data)
+        self._note_rows_by_year = self._notes_table.rows_by_year()
+        
+        if not self.note_selection_params:
+            return
+        
+        target_protection = self.note_selection_params.get('protection_level')
+        for year, rows in self._note_rows_by_year.items():
+            if target_protection is None:
+                # No protection level specified, use first note
+                row = int(rows[0])
+            else:
+                row = self._notes_table.closest_row(rows, target_protection)
+            self._selected_note_by_year[year] = self.notes_data.iloc[row].to_dict()
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            lines = [f"Precomputed notes for {len(self._selected_note_by_year)} years:"]
+            for year, note in self._selected_note_by_year.items():
+                lines.append(f"  {year}: {note['protection_level']:.0%} {note.get('protection_type', 'Buffer')}, "
+                             f"PR: {note['participation_rate']:.4f}")
+            logger.debug("\n".join(lines))
+    
     def _get_note_for_year(self, year):
         """
         Get structured note parameters for the given year.
@@ -84,62 +208,19 @@ class PortfolioSimulation:
         Returns:
         - note_params: Dict of note parameters
         """
-        logger.info(f"Selecting structured note for year {year}")
-        
         # If notes were pre-selected, use them
         if self.pre_selected_notes and year in self.pre_selected_notes:
-            note_params = self.pre_selected_notes[year]
-            logger.info(f"Using pre-selected note for year {year}: "
-                      f"{note_params['protection_level']:.0%} {note_params.get('protection_type', 'Buffer')}, "
-                      f"PR: {note_params['participation_rate']:.4f}")
-            return note_params
+            return self.pre_selected_notes[year]
         
-        # Otherwise, filter notes for this year based on selection params
+        # Otherwise, use the note selected for this year in _index_notes
         if self.notes_data is not None and self.note_selection_params:
-            year_notes = self.notes_data[self.notes_data['year'] == year]
-            
-            if not year_notes.empty:
-                logger.info(f"Found {len(year_notes)} notes available for year {year}")
-                
-                # Filter by protection level if specified
-                if 'protection_level' in self.note_selection_params:
-                    target_protection = self.note_selection_params['protection_level']
-                    logger.info(f"Target protection level: {target_protection:.0%}")
-                    
-                    matching_notes = year_notes[year_notes['protection_level'] == target_protection]
-                    
-                    if not matching_notes.empty:
-                        note_params = matching_notes.iloc[0].to_dict()
-                        logger.info(f"Found exact match: {note_params['protection_level']:.0%} "
-                                  f"{note_params.get('protection_type', 'Buffer')}, "
-                                  f"PR: {note_params['participation_rate']:.4f}")
-                        return note_params
-                    else:
-                        # Find closest match
-                        logger.info(f"No exact {target_protection:.0%} buffer note found. Looking for closest match...")
-                        
-                        year_notes['distance'] = abs(year_notes['protection_level'] - target_protection)
-                        closest_note = year_notes.sort_values('distance').iloc[0]
-                        
-                        logger.info(f"Selected closest match: {closest_note['protection_level']:.0%} "
-                                  f"{closest_note.get('protection_type', 'Buffer')}, "
-                                  f"PR: {closest_note['participation_rate']:.4f} "
-                                  f"(distance: {closest_note['distance']:.0%})")
-                        
-                        return closest_note.to_dict()
-                else:
-                    # No protection level specified, use first note
-                    note_params = year_notes.iloc[0].to_dict()
-                    logger.info(f"No specific protection level requested. Using first available note: "
-                              f"{note_params['protection_level']:.0%} {note_params.get('protection_type', 'Buffer')}, "
-                              f"PR: {note_params['participation_rate']:.4f}")
-                    return note_params
-            else:
-                logger.warning(f"No notes available for year {year}")
+            if year in self._selected_note_by_year:
+                return dict(self._selected_note_by_year[year])
+            logger.warning(f"No notes available for year {year}")
         
         # Default note parameters if no data available
         logger.warning(f"No structured note data available for year {year}. Using default parameters.")
-        default_params = {
+        return {
             'participation_rate': 1.0,
             'protection_level': 0.1,
             'protection_type': 'Buffer',
@@ -147,56 +228,53 @@ class PortfolioSimulation:
             'underlying_asset': 'S&P 500',
             'year': year
         }
-        logger.info(f"Default note parameters: {default_params['protection_level']:.0%} "
-                  f"{default_params['protection_type']}, PR: {default_params['participation_rate']:.2f}")
-        return default_params
     
-    def _get_year_returns(self, year):
+    def _build_year_returns(self):
         """
-        Get returns for all asset classes for the given year.
+        Lay out every simulated year's returns as rows indexed by the asset columns.
         
-        Parameters:
-        - year: Year to get returns for
+        Structured note returns for the whole horizon are computed in one pass
+        from each year's selected note.
         
         Returns:
-        - returns_dict: Dict mapping asset names to returns
+        - all_returns: Array of shape (n_years, n_asset_columns)
         """
-        returns_dict = {
-            'sp500': self.sp500_returns.get(year, 0),
-            'bonds': self.bond_returns.get(year, 0)
-        }
-        
-        # Log market returns first
-        logger.info(f"===== YEAR {year} RETURNS =====")
-        logger.info(f"S&P 500: {returns_dict['sp500']:.4%}, Bond: {returns_dict['bonds']:.4%}")
+        years = self._years.tolist()
+        all_returns = np.zeros((len(years), len(self._asset_columns)))
+        all_returns[:, :self._returns_matrix.shape[1]] = self._returns_matrix
+        sp500 = self._sp500_arr
+        bonds = self._bond_arr
         
-        # Calculate structured note return if any portfolio uses them
-        if any('notes' in alloc for alloc in self.portfolio_allocations.values()):
-            # Get note parameters for this year
-            note_params = self._get_note_for_year(year)
+        # Calculate structured note returns if any portfolio uses them
+        uses_notes = self._needs_notes
+        if uses_notes:
+            note_params = [self._get_note_for_year(year) for year in years]
+            participation_rates = [params.get('participation_rate', 1.0) for params in note_params]
+            protection_levels = [params.get('protection_level', 0.0) for params in note_params]
+            protection_types = [params.get('protection_type', 'Buffer') for params in note_params]
             
-            # Create note and calculate return
-            note = create_note(note_params)
-            underlying_return = returns_dict['sp500']
-            
-            # Log structured note parameters
-            logger.info(f"STRUCTURED NOTE: {note}")
-            logger.info(f"- Protection Level: {note_params['protection_level']:.2%}")
-            logger.info(f"- Participation Rate: {note_params['participation_rate']:.4f}")
-            logger.info(f"- Protection Type: {note_params.get('protection_type', 'Buffer')}")
-            
-            # Calculate return - the detailed calculation logs are in the note's calculate_return method
-            logger.info(f"- Underlying Asset Return: {underlying_return:.4%}")
-            note_return = note.calculate_return(underlying_return)
-            
-            returns_dict['notes'] = note_return
-            
-            # Log final note return
-            logger.info(f"- Final Note Return: {note_return:.4%}")
-        else:
-            logger.debug(f"Year {year}: No structured notes in any portfolio")
+            note_returns = vectorized_note_payoff(sp500, participation_rates, protection_levels, protection_types)
+            all_returns[:, self._asset_columns['notes']] = note_returns
+        
+        # Per-year return logs are skipped entirely when INFO is disabled
+        if logger.isEnabledFor(logging.INFO):
+            for t, year in enumerate(years):
+                lines = [f"===== YEAR {year} RETURNS =====",
+                         f"S&P 500: {sp500[t]:.4%}, Bond: {bonds[t]:.4%}"]
+                
+                if uses_notes:
+                    # Structured note parameters
+                    lines += ["STRUCTURED NOTE:",
+                              f"- Protection Level: {protection_levels[t]:.2%}",
+                              f"- Participation Rate: {participation_rates[t]:.4f}",
+                              f"- Protection Type: {protection_types[t]}",
+                              f"- Underlying Asset Return: {sp500[t]:.4%}",
+                              f"- Final Note Return: {note_returns[t]:.4%}"]
+                
+                # One log record per year
+                logger.info("\n".join(lines))
         
-        return returns_dict
+        return all_returns
     
     def run_simulation(self):
         """
@@ -207,45 +285,251 @@ class PortfolioSimulation:
         """
         logger.info(f"Running simulation from {self.start_year} to {self.end_year}")
         
-        for year in range(self.start_year, self.end_year + 1):
-            logger.info(f"Simulating year {year}")
+        self._allocate_results()
+        
+        # Gross returns (1 + r) for every year and asset, shared by all portfolios
+        gross_returns = 1.0 + self._build_year_returns()
+        
+        if not self.withdrawal_strategy:
+            self._run_vectorized(gross_returns)
+        elif not self._run_strategy_kernel(gross_returns):
+            # Strategies without a withdrawal schedule are evaluated year by year
+            self._run_years_individually(gross_returns)
+        
+        # Per-year result records are built from the result arrays
+        for name in self.portfolios:
+            self.results[name] = self._build_year_results(name)
+        
+        logger.info("Simulation completed")
+        return self.results
+    
+    def _allocate_results(self):
+        """
+        Preallocate one result array per output column and portfolio.
+        
+        Asset values live in one column-major (n_years, n_assets) array per portfolio,
+        and its columns double as the '{asset}_value' entries of self._cols.
+        """
+        n_years = len(self._years)
+        withdrawal_dtype = np.float64 if self.withdrawal_strategy else np.int64
+        
+        for name, portfolio in self.portfolios.items():
+            assets = list(portfolio.allocations)
+            asset_values = np.empty((n_years, len(assets)), dtype=np.float64, order='F')
+            self._asset_values[name] = asset_values
             
-            # Get returns for this year
-            returns_dict = self._get_year_returns(year)
+            columns = {
+                'portfolio_value': np.empty(n_years, dtype=np.float64),
+                'annual_return': np.empty(n_years, dtype=np.float64),
+                'withdrawal': np.zeros(n_years, dtype=withdrawal_dtype)
+            }
+            columns.update({f'{asset}_value': asset_values[:, k] for k, asset in enumerate(assets)})
+            self._cols[name] = columns
+    
+    def _run_vectorized(self, gross_returns):
+        """
+        Compute every portfolio's value path over all years with array operations.
+        
+        Parameters:
+        - gross_returns: Array of shape (n_years, n_asset_columns) holding 1 + return
+        """
+        years = self._years.tolist()
+        if not years:
+            return
+        
+        for name, portfolio in self.portfolios.items():
+            gross_matrix = gross_returns[:, portfolio._ret_idx]
+            initial_value = float(portfolio.get_total_value())
+            
+            # Cumulative product of the weighted annual gross returns
+            values = initial_value * np.cumprod(gross_matrix @ portfolio._alloc_vec)
+            prev_values = np.concatenate(([initial_value], values[:-1]))
+            annual_returns = np.divide(values, prev_values, out=np.ones_like(values),
+                                       where=np.abs(prev_values) > 1e-8) - 1.0
+            
+            self._cols[name]['portfolio_value'][:] = values
+            self._cols[name]['annual_return'][:] = annual_returns
+            self._record_asset_values(name, portfolio, gross_matrix, initial_value)
+            
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("\n".join(
+                    f"  Portfolio '{name}' {year}: ${portfolio_value:,.2f} (Return: {annual_return:.2%})"
+                    for year, portfolio_value, annual_return in zip(years, values, annual_returns)))
+            
+            # Leave the portfolio object at its year-end, rebalanced state
+            portfolio.prev_value = float(prev_values[-1])
+            portfolio.current_value = float(values[-1])
+            portfolio.rebalance()
+    
+    def _run_strategy_kernel(self, gross_returns):
+        """
+        Run every portfolio and its withdrawals through the compiled strategy kernel.
+        
+        Parameters:
+        - gross_returns: Array of shape (n_years, n_asset_columns) holding 1 + return
+        
+        Returns:
+        - handled: False if the withdrawal strategy provides no withdrawal schedule
+        """
+        years = self._years
+        if not len(years):
+            return True
+        
+        # Strategies that track an initial value take it from the first portfolio
+        first_portfolio = next(iter(self.portfolios.values()))
+        first_year_value = float(first_portfolio.get_total_value() *
+                                 (gross_returns[0, first_portfolio._ret_idx] @ first_portfolio._alloc_vec))
+        schedule = self.withdrawal_strategy.withdrawal_schedule(years, first_year_value)
+        if schedule is None:
+            return False
+        fixed_amounts, rates = (np.ascontiguousarray(a, dtype=np.float64) for a in schedule)
+        
+        for name, portfolio in self.portfolios.items():
+            gross_matrix = np.ascontiguousarray(gross_returns[:, portfolio._ret_idx])
+            initial_value = float(portfolio.get_total_value())
+            values, annual_returns, withdrawals = simulate_with_strategy(
+                gross_matrix, portfolio._alloc_vec, initial_value, fixed_amounts, rates)
+            
+            prev_values = np.concatenate(([initial_value], values[:-1]))
+            
+            self._cols[name]['portfolio_value'][:] = values
+            self._cols[name]['annual_return'][:] = annual_returns
+            self._cols[name]['withdrawal'][:] = withdrawals
+            self._record_asset_values(name, portfolio, gross_matrix, initial_value)
+            
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("\n".join(
+                    f"  Portfolio '{name}' {year}: ${portfolio_value:,.2f} (Return: {annual_return:.2%})"
+                    for year, portfolio_value, annual_return in zip(years.tolist(), values, annual_returns)))
+            
+            # Leave the portfolio object at its year-end, rebalanced state
+            portfolio.prev_value = float(prev_values[-1])
+            portfolio.current_value = float(values[-1])
+            portfolio.rebalance()
+        
+        return True
+    
+    def _run_years_individually(self, gross_returns):
+        """
+        Run the simulation one year at a time on scalar portfolio totals.
+        
+        With annual rebalancing each year's growth is a single dot product of the
+        weights and the gross returns, so only the total is carried from year to
+        year; asset values are reconstructed from the value path afterwards. The
+        Portfolio objects are only updated for the withdrawal strategy and left
+        at their final, rebalanced state at the end.
+        
+        Parameters:
+        - gross_returns: Array of shape (n_years, n_asset_columns) holding 1 + return
+        """
+        initial_values = {name: float(portfolio.get_total_value()) for name, portfolio in self.portfolios.items()}
+        totals = dict(initial_values)
+        prev_totals = {name: portfolio.prev_value for name, portfolio in self.portfolios.items()}
+        
+        info = logger.isEnabledFor(logging.INFO)
+        for t, year in enumerate(self._years.tolist()):
+            if info:
+                logger.info(f"Simulating year {year}")
+            
+            # Get gross returns for this year
+            gross_row = gross_returns[t]
             
             # Process each portfolio
             for name, portfolio in self.portfolios.items():
-                # Apply returns
-                portfolio.apply_returns(returns_dict)
+                # Apply returns to the rebalanced portfolio
+                prev_total = totals[name]
+                total = prev_total * float(portfolio._alloc_vec @ gross_row[portfolio._ret_idx])
                 
                 # Calculate withdrawal if strategy exists
                 withdrawal_amount = 0
                 if self.withdrawal_strategy:
+                    portfolio.prev_value = prev_total
+                    portfolio.current_value = total
                     withdrawal_amount = self.withdrawal_strategy.calculate_withdrawal(portfolio, year)
-                    portfolio.withdraw(withdrawal_amount)
+                    
+                    if withdrawal_amount > 0:
+                        # Cap withdrawal at current value
+                        actual_withdrawal = min(withdrawal_amount, total)
+                        if actual_withdrawal < withdrawal_amount:
+                            logger.warning(f"Insufficient funds for withdrawal. Requested: ${withdrawal_amount:,.2f}, Available: ${total:,.2f}")
+                        total -= actual_withdrawal
                 
                 # Record results
-                portfolio_value = portfolio.get_total_value()
-                annual_return = portfolio.get_annual_return()
+                annual_return = 0 if abs(prev_total) <= 1e-8 else (total / prev_total) - 1
                 
-                year_result = {
-                    'year': year,
-                    'portfolio_value': portfolio_value,
-                    'annual_return': annual_return,
-                    'withdrawal': withdrawal_amount,
-                    'asset_values': portfolio.get_asset_values(),
-                    'asset_allocations': portfolio.get_asset_allocations()
-                }
+                self._cols[name]['portfolio_value'][t] = total
+                self._cols[name]['annual_return'][t] = annual_return
+                self._cols[name]['withdrawal'][t] = withdrawal_amount
+                prev_totals[name] = prev_total
+                totals[name] = total
                 
-                self.results[name].append(year_result)
-                
-                logger.info(f"  Portfolio '{name}': ${portfolio_value:,.2f} (Return: {annual_return:.2%})")
-                
-                # Rebalance portfolio for next year
-                portfolio.rebalance()
+                if info:
+                    logger.info(f"  Portfolio '{name}': ${total:,.2f} (Return: {annual_return:.2%})")
         
-        logger.info("Simulation completed")
-        return self.results
+        for name, portfolio in self.portfolios.items():
+            self._record_asset_values(name, portfolio, gross_returns[:, portfolio._ret_idx], initial_values[name])
+            
+            # Leave the portfolio object at its year-end, rebalanced state
+            portfolio.prev_value = prev_totals[name]
+            portfolio.current_value = totals[name]
+            portfolio.rebalance()
+    
+    def _record_asset_values(self, name, portfolio, gross_matrix, initial_value):
+        """
+        Reconstruct a portfolio's year-end asset values from its recorded value path.
+        
+        Each year the assets start at total * weights, drift with that year's returns
+        and give up any withdrawal proportionally.
+        
+        Parameters:
+        - name: Portfolio name
+        - portfolio: Portfolio object
+        - gross_matrix: Array of shape (n_years, n_assets) with the portfolio's gross asset returns
+        - initial_value: Portfolio value before the first year
+        """
+        values = self._cols[name]['portfolio_value']
+        if not values.size:
+            return
+        
+        prev_values = np.concatenate(([initial_value], values[:-1]))
+        drifted = prev_values[:, None] * portfolio._alloc_vec * gross_matrix
+        
+        # Withdrawals scale every asset by the same post-withdrawal ratio
+        withdrawn = self._cols[name]['withdrawal'] > 0
+        if withdrawn.any():
+            pre_withdrawal = drifted.sum(axis=1)
+            scale = np.divide(values, pre_withdrawal, out=np.ones_like(values),
+                              where=withdrawn & (pre_withdrawal != 0))
+            drifted *= scale[:, None]
+        
+        self._asset_values[name][:] = drifted
+    
+    def _asset_allocations(self, name):
+        """Return the (n_years, n_assets) array of drifted asset allocations for a portfolio."""
+        values = self._cols[name]['portfolio_value']
+        nonzero = ~np.isclose(values, 0)
+        allocations = np.zeros_like(self._asset_values[name])
+        np.divide(self._asset_values[name], values[:, None], out=allocations, where=nonzero[:, None])
+        return allocations
+    
+    def _build_year_results(self, name):
+        """Build the list of per-year result dicts for a portfolio from the result arrays."""
+        assets = list(self.portfolios[name].allocations)
+        allocations = self._asset_allocations(name)
+        
+        return [
+            {
+                'year': year,
+                'portfolio_value': portfolio_value,
+                'annual_return': annual_return,
+                'withdrawal': withdrawal,
+                'asset_values': dict(zip(assets, asset_values)),
+                'asset_allocations': dict(zip(assets, asset_allocations))
+            }
+            for year, portfolio_value, annual_return, withdrawal, asset_values, asset_allocations in zip(
+                self._years.tolist(), self._cols[name]['portfolio_value'].tolist(), self._cols[name]['annual_return'].tolist(),
+                self._cols[name]['withdrawal'].tolist(), self._asset_values[name].tolist(), allocations.tolist())
+        ]
     
     def get_results_dataframe(self):
         """
@@ -254,38 +538,66 @@ class PortfolioSimulation:
         Returns:
         - df: DataFrame with simulation results
         """
-        # Create a list to hold all data
-        all_data = []
-        
-        for portfolio_name, years_data in self.results.items():
-            for year_data in years_data:
-                row = {
-                    'portfolio': portfolio_name,
-                    'year': year_data['year'],
-                    'portfolio_value': year_data['portfolio_value'],
-                    'annual_return': year_data['annual_return'],
-                    'withdrawal': year_data['withdrawal']
-                }
-                
-                # Add asset values as separate columns
-                for asset, value in year_data['asset_values'].items():
-                    row[f'{asset}_value'] = value
-                
-                # Add asset allocations as separate columns
-                for asset, allocation in year_data['asset_allocations'].items():
-                    row[f'{asset}_allocation'] = allocation
-                
-                all_data.append(row)
+        if not self._cols or len(self._years) == 0:
+            return pd.DataFrame()
+        
+        # Build one frame per portfolio straight from the result columns
+        frames = []
+        for name, portfolio in self.portfolios.items():
+            allocations = self._asset_allocations(name)
+            allocation_columns = {f'{asset}_allocation': allocations[:, k]
+                                  for k, asset in enumerate(portfolio.allocations)}
+            frames.append(pd.DataFrame({'portfolio': name, 'year': self._years,
+                                        **self._cols[name], **allocation_columns}))
         
-        # Convert to DataFrame
-        df = pd.DataFrame(all_data)
+        df = pd.concat(frames, ignore_index=True)
         
         # Sort by portfolio and year
-        if not df.empty:
-            df = df.sort_values(['portfolio', 'year'])
+        df = df.sort_values(['portfolio', 'year'])
         
         return df
     
+    def get_result_row_count(self):
+        """Return the number of (portfolio, year) rows in the simulation results."""
+        return len(self._cols) * len(self._years)
+    
+    def stream_results(self, path):
+        """
+        Write simulation results to CSV row by row without building a DataFrame.
+        
+        Rows and columns match get_results_dataframe, so memory use stays flat
+        regardless of the number of portfolios and years.
+        
+        Parameters:
+        - path: Path of the CSV file to write
+        """
+        # Column layout matches the union of asset columns across portfolios
+        asset_columns = []
+        for portfolio in self.portfolios.values():
+            for column in [f'{a}_value' for a in portfolio.allocations] + [f'{a}_allocation' for a in portfolio.allocations]:
+                if column not in asset_columns:
+                    asset_columns.append(column)
+        header = ['portfolio', 'year', 'portfolio_value', 'annual_return', 'withdrawal'] + asset_columns
+        
+        with open(path, 'w', newline='', buffering=1024 * 1024) as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            
+            for name in sorted(self._cols):
+                assets = list(self.portfolios[name].allocations)
+                positions = [asset_columns.index(f'{a}_value') for a in assets]
+                positions += [asset_columns.index(f'{a}_allocation') for a in assets]
+                
+                allocations = self._asset_allocations(name)
+                for t, year in enumerate(self._years.tolist()):
+                    row = [name, year, self._cols[name]['portfolio_value'][t].item(), self._cols[name]['annual_return'][t].item(),
+                           self._cols[name]['withdrawal'][t].item()] + [''] * len(asset_columns)
+                    for position, value in zip(positions, self._asset_values[name][t].tolist() + allocations[t].tolist()):
+                        row[5 + position] = value
+                    writer.writerow(row)
+        
+        logger.info(f"Streamed {self.get_result_row_count()} result rows to {path}")
+    
     def calculate_summary_statistics(self):
         """
         Calculate summary statistics for each portfolio.
@@ -295,28 +607,32 @@ class PortfolioSimulation:
         """
         summary = {}
         
-        for name, years_data in self.results.items():
-            # Extract portfolio values and returns
-            values = [data['portfolio_value'] for data in years_data]
-            returns = [data['annual_return'] for data in years_data]
+        empty = np.empty(0)
+        for name in self.portfolios:
+            # Portfolio values and returns straight from the result columns
+            columns = self._cols.get(name, {})
+            values = columns.get('portfolio_value', empty)
+            returns = columns.get('annual_return', empty)
+            n_years = values.size
+            final_value = float(values[-1]) if n_years else 0
             
             # Calculate statistics
-            total_return = (values[-1] / self.initial_value) - 1 if values else 0
-            cagr = (values[-1] / self.initial_value) ** (1 / len(years_data)) - 1 if values else 0
+            total_return = (final_value / self.initial_value) - 1 if n_years else 0
+            cagr = (final_value / self.initial_value) ** (1 / n_years) - 1 if n_years else 0
             max_drawdown = self._calculate_max_drawdown(values)
             
             # Calculate volatility
-            volatility = np.std(returns) if len(returns) > 1 else 0
+            volatility = float(returns.std()) if returns.size > 1 else 0
             
             # Create summary for this portfolio
             summary[name] = {
                 'initial_value': self.initial_value,
-                'final_value': values[-1] if values else 0,
+                'final_value': final_value,
                 'total_return': total_return,
                 'cagr': cagr,
                 'volatility': volatility,
                 'max_drawdown': max_drawdown,
-                'years': len(years_data)
+                'years': n_years
             }
         
         return summary
@@ -326,22 +642,15 @@ class PortfolioSimulation:
         Calculate maximum drawdown from a series of values.
         
         Parameters:
-        - values: List of portfolio values
+        - values: List or array of portfolio values
         
         Returns:
         - max_drawdown: Maximum drawdown as a decimal
         """
-        if not values or len(values) < 2:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) < 2:
             return 0
         
-        peak = values[0]
-        max_drawdown = 0
-        
-        for value in values:
-            if value > peak:
-                peak = value
-            
-            drawdown = (peak - value) / peak if peak > 0 else 0
-            max_drawdown = max(max_drawdown, drawdown)
-        
-        return max_drawdown 
\ No newline at end of file
+        peaks = np.maximum.accumulate(values)
+        drawdowns = np.divide(peaks - values, peaks, out=np.zeros_like(values), where=peaks > 0)
+        return float(drawdowns.max())
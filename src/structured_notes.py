@@ -43,6 +43,14 @@ class StructuredNote:
 class BufferedNote(StructuredNote):
     """Specific implementation for buffered notes."""
     
+    def __init__(self, params):
+        """Initialize with note parameters and bind the payoff to them."""
+        super().__init__(params)
+        
+        # Below zero, -(|r| - protection) collapses to r + protection
+        self._payoff = (lambda r, pr=self.participation_rate, prot=self.protection_level:
+                        r * pr if r > 0 else (0.0 if -r <= prot else r + prot))
+    
     def calculate_return(self, underlying_return):
         """
         Calculate buffered note return.
@@ -59,45 +67,70 @@ class BufferedNote(StructuredNote):
         Returns:
         - note_return: Annual return of the structured note
         """
-        logger.info(f"BUFFERED NOTE CALCULATION:")
-        logger.info(f"  Step 1: Analyze underlying return: {underlying_return:.4%}")
+        if not logger.isEnabledFor(logging.INFO):
+            return self._payoff(underlying_return)
+        
+        lines = ["BUFFERED NOTE CALCULATION:",
+                 f"  Step 1: Analyze underlying return: {underlying_return:.4%}"]
         
         # For positive returns, apply participation rate
         if underlying_return > 0:
-            logger.info(f"  Step 2: Positive return detected, applying participation rate")
-            logger.info(f"    Calculation: {underlying_return:.4%} × {self.participation_rate:.4f}")
             note_return = underlying_return * self.participation_rate
-            logger.info(f"  Step 3: Final positive return result: {note_return:.4%}")
-            return note_return
+            lines += ["  Step 2: Positive return detected, applying participation rate",
+                      f"    Calculation: {underlying_return:.4%} × {self.participation_rate:.4f}",
+                      f"  Step 3: Final positive return result: {note_return:.4%}"]
         
         # For negative returns, apply buffer logic
         else:
             # Convert to absolute value for comparison
             abs_return = abs(underlying_return)
-            logger.info(f"  Step 2: Negative return detected, applying buffer protection")
-            logger.info(f"    Absolute value of return: |{underlying_return:.4%}| = {abs_return:.4%}")
-            logger.info(f"    Buffer protection level: {self.protection_level:.4%}")
+            lines += ["  Step 2: Negative return detected, applying buffer protection",
+                      f"    Absolute value of return: |{underlying_return:.4%}| = {abs_return:.4%}",
+                      f"    Buffer protection level: {self.protection_level:.4%}"]
             
             # Check if loss is within the protection buffer
             if abs_return <= self.protection_level:
                 # Full protection - no loss
-                logger.info(f"  Step 3: Loss is WITHIN buffer ({abs_return:.4%} ≤ {self.protection_level:.4%})")
-                logger.info(f"    Full downside protection applies")
-                logger.info(f"  Step 4: Final return result: 0.00%")
-                return 0.0
+                note_return = 0.0
+                lines += [f"  Step 3: Loss is WITHIN buffer ({abs_return:.4%} ≤ {self.protection_level:.4%})",
+                          "    Full downside protection applies",
+                          "  Step 4: Final return result: 0.00%"]
             else:
                 # Partial protection - loss beyond buffer
-                logger.info(f"  Step 3: Loss EXCEEDS buffer ({abs_return:.4%} > {self.protection_level:.4%})")
                 excess_loss = abs_return - self.protection_level
-                logger.info(f"    Excess loss beyond buffer: {abs_return:.4%} - {self.protection_level:.4%} = {excess_loss:.4%}")
                 note_return = -excess_loss
-                logger.info(f"  Step 4: Final return result: {note_return:.4%}")
-                return note_return
+                lines += [f"  Step 3: Loss EXCEEDS buffer ({abs_return:.4%} > {self.protection_level:.4%})",
+                          f"    Excess loss beyond buffer: {abs_return:.4%} - {self.protection_level:.4%} = {excess_loss:.4%}",
+                          f"  Step 4: Final return result: {note_return:.4%}"]
+        
+        # One log record for the whole calculation
+        logger.info("\n".join(lines))
+        return note_return
+    
+    def calculate_returns_vec(self, underlying_returns):
+        """
+        Calculate buffered note returns for an array of underlying returns.
+        
+        Parameters:
+        - underlying_returns: Array of annual returns of the underlying asset
+        
+        Returns:
+        - note_returns: Array of annual returns of the structured note
+        """
+        r = np.asarray(underlying_returns, dtype=np.float64)
+        return np.where(r > 0, r * self.participation_rate,
+                        -np.maximum(np.abs(r) - self.protection_level, 0.0))
 
 
 class FlooredNote(StructuredNote):
     """Implementation for floored notes (full downside protection)."""
     
+    def __init__(self, params):
+        """Initialize with note parameters and bind the payoff to them."""
+        super().__init__(params)
+        self._payoff = (lambda r, pr=self.participation_rate, prot=self.protection_level:
+                        r * pr if r > 0 else (r if r > -prot else -prot))
+    
     def calculate_return(self, underlying_return):
         """
         Calculate floored note return.
@@ -113,37 +146,55 @@ class FlooredNote(StructuredNote):
         Returns:
         - note_return: Annual return of the structured note
         """
-        logger.info(f"FLOORED NOTE CALCULATION:")
-        logger.info(f"  Step 1: Analyze underlying return: {underlying_return:.4%}")
+        if not logger.isEnabledFor(logging.INFO):
+            return self._payoff(underlying_return)
+        
+        lines = ["FLOORED NOTE CALCULATION:",
+                 f"  Step 1: Analyze underlying return: {underlying_return:.4%}"]
         
         # For positive returns, apply participation rate
         if underlying_return > 0:
-            logger.info(f"  Step 2: Positive return detected, applying participation rate")
-            logger.info(f"    Calculation: {underlying_return:.4%} × {self.participation_rate:.4f}")
             note_return = underlying_return * self.participation_rate
-            logger.info(f"  Step 3: Final positive return result: {note_return:.4%}")
-            return note_return
+            lines += ["  Step 2: Positive return detected, applying participation rate",
+                      f"    Calculation: {underlying_return:.4%} × {self.participation_rate:.4f}",
+                      f"  Step 3: Final positive return result: {note_return:.4%}"]
         
         # For negative returns, apply floor logic
         else:
             # Limit the loss to the protection level
-            logger.info(f"  Step 2: Negative return detected, applying floor protection")
-            logger.info(f"    Underlying negative return: {underlying_return:.4%}")
-            logger.info(f"    Floor protection level: -{self.protection_level:.4%}")
-            
             max_loss = -self.protection_level
-            logger.info(f"    Maximum allowable loss: {max_loss:.4%}")
             note_return = max(underlying_return, max_loss)
             
+            lines += ["  Step 2: Negative return detected, applying floor protection",
+                      f"    Underlying negative return: {underlying_return:.4%}",
+                      f"    Floor protection level: -{self.protection_level:.4%}",
+                      f"    Maximum allowable loss: {max_loss:.4%}"]
+            
             if underlying_return < max_loss:
-                logger.info(f"  Step 3: Underlying loss EXCEEDS floor (worse than {max_loss:.4%})")
-                logger.info(f"    Floor protection applied: loss limited to {max_loss:.4%}")
+                lines += [f"  Step 3: Underlying loss EXCEEDS floor (worse than {max_loss:.4%})",
+                          f"    Floor protection applied: loss limited to {max_loss:.4%}"]
             else:
-                logger.info(f"  Step 3: Underlying loss WITHIN floor ({underlying_return:.4%} ≥ {max_loss:.4%})")
-                logger.info(f"    Actual underlying return used (no protection needed)")
+                lines += [f"  Step 3: Underlying loss WITHIN floor ({underlying_return:.4%} ≥ {max_loss:.4%})",
+                          "    Actual underlying return used (no protection needed)"]
             
-            logger.info(f"  Step 4: Final return result: {note_return:.4%}")
-            return note_return
+            lines.append(f"  Step 4: Final return result: {note_return:.4%}")
+        
+        # One log record for the whole calculation
+        logger.info("\n".join(lines))
+        return note_return
+    
+    def calculate_returns_vec(self, underlying_returns):
+        """
+        Calculate floored note returns for an array of underlying returns.
+        
+        Parameters:
+        - underlying_returns: Array of annual returns of the underlying asset
+        
+        Returns:
+        - note_returns: Array of annual returns of the structured note
+        """
+        r = np.asarray(underlying_returns, dtype=np.float64)
+        return np.where(r > 0, r * self.participation_rate, np.maximum(r, -self.protection_level))
 
 
 def create_note(params):
@@ -180,23 +231,37 @@ def simple_note_payoff(underlying_return, participation_rate, protection_level,
     Returns:
     - note_return: Return of the structured note
     """
-    protection_type = protection_type.lower()
-    
-    # For positive returns
+    # Positive returns participate; a buffer absorbs losses up to the protection
+    # level, a floor caps them at it. Unknown types are treated as Buffer.
     if underlying_return > 0:
         return underlying_return * participation_rate
-    
-    # For negative returns
-    if protection_type == 'buffer':
-        if abs(underlying_return) <= protection_level:
-            return 0
-        else:
-            return -(abs(underlying_return) - protection_level)
-    elif protection_type == 'floor':
+    if protection_type.lower() == 'floor':
         return max(underlying_return, -protection_level)
-    else:
-        # Default to buffer
-        if abs(underlying_return) <= protection_level:
-            return 0
-        else:
-            return -(abs(underlying_return) - protection_level) 
\ No newline at end of file
+    return min(0.0, underlying_return + protection_level) 
+
+
+def vectorized_note_payoff(underlying_returns, participation_rate, protection_level, protection_type='Buffer'):
+    """
+    Calculate structured note payoffs for an array of underlying returns.
+    
+    Every parameter may be a scalar or an array with one entry per return, so
+    a different note can apply in each year.
+    
+    Parameters:
+    - underlying_returns: Array of returns of the underlying asset
+    - participation_rate: Participation rate(s) for upside returns
+    - protection_level: Level(s) of downside protection
+    - protection_type: Type(s) of protection (Buffer or Floor); unknown types are treated as Buffer
+    
+    Returns:
+    - note_returns: Array of note returns
+    """
+    r = np.asarray(underlying_returns, dtype=np.float64)
+    participation_rate = np.asarray(participation_rate, dtype=np.float64)
+    protection_level = np.asarray(protection_level, dtype=np.float64)
+    is_floor = np.char.lower(np.asarray(protection_type, dtype=str)) == 'floor'
+    
+    downside = np.where(is_floor,
+                        np.maximum(r, -protection_level),
+                        np.minimum(r + protection_level, 0.0))
+    return np.where(r > 0, r * participation_rate, downside)